@@ -1,18 +1,18 @@
 #!/usr/bin/env python3
 
-import pandas as pd
+from directory_store import DIRECTORY_PATH, read_directory, write_directory
 
-INPUT_CSV = "new_directory.csv"
-OUTPUT_CSV = "new_directory.csv"   # overwrite safely
+INPUT_DIRECTORY = DIRECTORY_PATH
+OUTPUT_DIRECTORY = DIRECTORY_PATH   # overwrite safely (atomic)
 
-df = pd.read_csv(INPUT_CSV)
+df = read_directory(path=INPUT_DIRECTORY)
 
 # Add new columns with fixed defaults
 df["exited"] = 0
 df["name_changed"] = 0
 df["new_name"] = ""
 
-df.to_csv(OUTPUT_CSV, index=False)
+write_directory(df, OUTPUT_DIRECTORY)
 
 print("✅ Columns added successfully")
 print("Added columns: exited, name_changed, new_name")
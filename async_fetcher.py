@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+asyncio fetch engine with pooled keep-alive connections.
+
+Each named pool (e.g. "live", "cdx", "replay") gets its own aiohttp session
+and connector, so connections are reused across requests and every pool has
+its own concurrency limit. Requests queue on a per-pool semaphore before
+the timeout and the latency clock start, so a deep queue doesn't time out
+waiting for a free connection. Retries back off with asyncio.sleep outside
+the semaphore, so a throttled pool never blocks the others.
+"""
+
+import asyncio
+import json
+import random
+import time
+
+import aiohttp
+
+# ================= CONFIG =================
+
+DEFAULT_HEADERS = {"User-Agent": "DirectoryBot/FINAL"}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 1.0      # seconds, doubled per attempt
+BACKOFF_CAP = 60.0
+
+KEEPALIVE_TIMEOUT = 30
+
+# ================= FETCHER =================
+
+class Fetcher:
+    """
+    async with Fetcher({"live": 10, "cdx": 4}) as fetcher:
+        html = await fetcher.get_text("live", url)
+
+    Pass a StageMetrics as `metrics` to record latency, retries and status
+    codes per pool.
+    """
+
+    def __init__(self, pool_limits, headers=None, retries=3, metrics=None):
+        self.pool_limits = pool_limits
+        self.headers = headers or DEFAULT_HEADERS
+        self.retries = retries
+        self.metrics = metrics
+        self.sessions = {}
+        self.slots = {}
+
+    async def __aenter__(self):
+        for pool, limit in self.pool_limits.items():
+            # one slot per connection; waiting here is not timed
+            self.slots[pool] = asyncio.Semaphore(limit)
+            connector = aiohttp.TCPConnector(
+                limit=limit,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300,
+            )
+            self.sessions[pool] = aiohttp.ClientSession(connector=connector, headers=self.headers)
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.gather(*(s.close() for s in self.sessions.values()))
+        self.sessions = {}
+        self.slots = {}
+
+    async def request(self, pool, url, params=None, timeout=30, method="GET", allow_redirects=True):
+        """
+        GET `url` on `pool` → (status, body text, headers), or
+        (None, None, None) when every attempt failed. 200 and non-retryable
+        statuses return immediately; with allow_redirects=False a 3xx is
+        returned as-is (Location in the headers).
+        """
+        session = self.sessions[pool]
+        slots = self.slots[pool]
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+        for attempt in range(self.retries):
+            retry_after = None
+            status = None
+            async with slots:
+                start = time.perf_counter()
+                try:
+                    async with session.request(
+                        method, url, params=params, timeout=client_timeout, allow_redirects=allow_redirects
+                    ) as r:
+                        status = r.status
+                        if r.status not in RETRY_STATUSES:
+                            text = await r.text(errors="replace")
+                            self._record(pool, start, status)
+                            return r.status, text, dict(r.headers)
+                        retry_after = r.headers.get("Retry-After")
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+
+                self._record(pool, start, status)
+
+            if attempt + 1 < self.retries:
+                if self.metrics is not None:
+                    self.metrics.retry(pool)
+                await asyncio.sleep(backoff(attempt, retry_after))
+
+        return None, None, None
+
+    def _record(self, pool, start, status):
+        if self.metrics is not None:
+            self.metrics.request(pool, time.perf_counter() - start, status)
+
+    async def get_text(self, pool, url, params=None, timeout=30):
+        status, text, _ = await self.request(pool, url, params=params, timeout=timeout)
+        return text if status == 200 else None
+
+    async def get_json(self, pool, url, params=None, timeout=30):
+        text = await self.get_text(pool, url, params=params, timeout=timeout)
+        if text is None:
+            return None
+        try:
+            return json.loads(text) if text.strip() else []
+        except ValueError:
+            return None
+
+# ================= HELPERS =================
+
+def backoff(attempt, retry_after=None):
+    """
+    Seconds to wait before the next attempt (honours Retry-After)
+    """
+    if retry_after and retry_after.isdigit():
+        return min(BACKOFF_CAP, float(retry_after))
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    return delay * random.uniform(0.5, 1.5)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BeautifulSoup extraction vs lxml/XPath (serial and process pool).
+
+Uses pages from the page cache when it exists, otherwise synthetic tool
+pages of realistic size. Prints pages/second for each path.
+"""
+
+import os
+import random
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from page_cache import PAGE_CACHE_DB
+from page_extract import extract_fields
+
+# ================= CONFIG =================
+
+SAMPLE_PAGES = 2000
+WORKERS = os.cpu_count() or 1
+POOL_CHUNKSIZE = 16
+
+# ================= REFERENCE (previous BeautifulSoup path) =================
+
+def extract_name_release_bs4(html, snapshot_year=None):
+    soup = BeautifulSoup(html, "lxml")
+
+    name = None
+    h1 = soup.select_one("h1.title_inner")
+    if h1:
+        name = h1.get_text(" ", strip=True).split(" v")[0]
+
+    dates = []
+
+    if snapshot_year is None or snapshot_year >= 2025:
+        for d in soup.select(".version .changelog_title"):
+            try:
+                dates.append(datetime.strptime(d.text.strip(), "%B %d, %Y").date())
+            except ValueError:
+                pass
+    else:
+        for d in soup.select("span.launch_date_top"):
+            txt = d.text.strip()
+            for fmt in ("%Y-%m-%d", "%d %b %Y"):
+                try:
+                    dates.append(datetime.strptime(txt, fmt).date())
+                    break
+                except ValueError:
+                    pass
+
+    release = min(dates).isoformat() if dates else None
+    return name, release
+
+# ================= PAGES =================
+
+def cached_pages(limit):
+    if not Path(PAGE_CACHE_DB).exists():
+        return []
+    db = sqlite3.connect(PAGE_CACHE_DB)
+    rows = db.execute(
+        "SELECT b.body FROM pages p JOIN blobs b ON b.hash = p.hash "
+        "WHERE p.status = 200 LIMIT ?", (limit,)
+    ).fetchall()
+    db.close()
+    return [zlib.decompress(body).decode("utf-8") for (body,) in rows]
+
+
+def synthetic_page(i):
+    rnd = random.Random(i)
+    filler = "".join(
+        f'<div class="card"><a href="/ai/other-{j}/">Other tool {j}</a>'
+        f'<p class="desc">{"lorem ipsum " * rnd.randint(5, 30)}</p></div>'
+        for j in range(rnd.randint(80, 200))
+    )
+    versions = "".join(
+        f'<div class="version"><span class="changelog_title">'
+        f'{datetime(2023 + k % 3, 1 + k % 12, 1 + k % 28):%B %d, %Y}</span>'
+        f'<div class="changelog">{"fixed things " * 20}</div></div>'
+        for k in range(rnd.randint(1, 8))
+    )
+    return (
+        f'<html><head><title>Tool {i}</title></head><body>'
+        f'<h1 class="title_inner">Tool {i} <span>v1.{i % 9}</span></h1>'
+        f'<span class="launch_date_top">2023-0{1 + i % 9}-1{i % 9}</span>'
+        f'<span class="tag price">Free + from $5/mo</span>'
+        f'<div class="rating_top"><span class="average">4.{i % 10}</span>'
+        f'<span class="count">{i % 500} ratings</span></div>'
+        f'<div class="saves">{i * 7}</div>'
+        f'{versions}{filler}</body></html>'
+    )
+
+# ================= MAIN =================
+
+def timed(label, pages, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {len(pages) / elapsed:10.1f} pages/s   ({elapsed:.2f}s)")
+    return elapsed
+
+
+def main():
+    pages = cached_pages(SAMPLE_PAGES)
+    source = PAGE_CACHE_DB
+    if not pages:
+        pages = [synthetic_page(i) for i in range(SAMPLE_PAGES)]
+        source = "synthetic"
+
+    avg_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"Pages: {len(pages)} from {source} (avg {avg_kb:.0f} KB)\n")
+
+    base = timed("BeautifulSoup (serial)", pages,
+                 lambda: [extract_name_release_bs4(p) for p in pages])
+
+    fast = timed("lxml/XPath (serial)", pages,
+                 lambda: [extract_fields(p) for p in pages])
+
+    with ProcessPoolExecutor(WORKERS) as pool:
+        pool.submit(int).result()    # spawn workers outside the timing
+        par = timed(f"lxml/XPath ({WORKERS} processes)", pages,
+                    lambda: list(pool.map(extract_fields, pages, chunksize=POOL_CHUNKSIZE)))
+
+    print(f"\nSpeedup serial: {base / fast:.1f}x | process pool: {base / par:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark: every pipeline stage on synthetic inputs at several scales.
+
+For each scale the inputs are generated (see synthetic_data.py) into a
+scratch directory and the stages run there in pipeline order, each in its
+own process. Wall time, rows/s (tools per second) and peak RSS are
+appended to bench_results.jsonl, one record per stage and scale, tagged
+with the git commit; each run is compared with the previous run at the
+same scale so regressions stand out.
+
+Usage:
+    python bench_pipeline.py                         # 10k, 100k, 1M
+    python bench_pipeline.py --scales 10000 --stages exit_adder missed_live
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from synthetic_data import generate
+
+# ================= CONFIG =================
+
+REPO_DIR = Path(__file__).resolve().parent
+RESULTS = "bench_results.jsonl"
+
+SCALES = [10_000, 100_000, 1_000_000]
+
+# pipeline order; add_columns is a prerequisite of exit_adder
+STAGES = [
+    "url_extractor",
+    "directory_resolver",
+    "add_columns",
+    "exit_adder",
+    "missed_live",
+    "row_appender",
+]
+
+# slower than the previous run by this factor → flagged
+REGRESSION_FACTOR = 1.2
+
+# ================= HELPERS =================
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_stage(stage, work_dir):
+    """
+    Run one stage script in `work_dir` → (ok, seconds, peak RSS in MiB)
+    """
+    env = dict(os.environ, PYTHONPATH=str(REPO_DIR))
+
+    with open(Path(work_dir) / f"{stage}.log", "w") as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(REPO_DIR / f"{stage}.py")],
+            cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        # wait4 gives this child's own rusage (ru_maxrss is KiB on Linux)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode == 0, elapsed, usage.ru_maxrss / 1024
+
+
+def prepare(stage, work_dir):
+    # missed_live.csv is hand-copied from missed_live's output in the real runs
+    if stage == "row_appender":
+        shutil.copy(Path(work_dir) / "inactive_or_old_urls.csv", Path(work_dir) / "missed_live.csv")
+
+
+def previous_results(path):
+    if not Path(path).exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
+
+
+def compare(records, history):
+    """
+    Print this run next to the last earlier run at the same scale
+    """
+    print(f"\n{'scale':>9} {'stage':<20} {'seconds':>9} {'rows/s':>11} {'peak MiB':>9} {'vs prev':>8}")
+
+    for r in records:
+        prev = None
+        if len(history):
+            same = history[(history["scale"] == r["scale"]) & (history["stage"] == r["stage"]) & history["ok"]]
+            if len(same):
+                prev = same.iloc[-1]
+
+        delta, flag = "", ""
+        if prev is not None and r["ok"] and prev["seconds"] > 0:
+            ratio = r["seconds"] / prev["seconds"]
+            delta = f"{ratio:.2f}x"
+            flag = "  ← slower" if ratio > REGRESSION_FACTOR else ""
+
+        status = "" if r["ok"] else "  FAILED"
+        print(
+            f"{r['scale']:>9} {r['stage']:<20} {r['seconds']:>9.2f} {r['rows_per_s']:>11.0f} "
+            f"{r['peak_rss_mb']:>9.0f} {delta:>8}{flag}{status}"
+        )
+
+# ================= MAIN =================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--results", default=RESULTS)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directories")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    history = previous_results(args.results)
+    run = {
+        "run_id": uuid.uuid4().hex[:12],
+        "commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpus": os.cpu_count(),
+    }
+    records = []
+
+    for scale in args.scales:
+        work_dir = tempfile.mkdtemp(prefix=f"bench_{scale}_")
+        print(f"== {scale} tools → {work_dir}")
+
+        start = time.perf_counter()
+        generate(work_dir, scale, args.seed)
+        print(f"   inputs generated in {time.perf_counter() - start:.1f}s")
+
+        # stages run in pipeline order; unselected prerequisites still run
+        last = max(STAGES.index(s) for s in args.stages)
+        for stage in STAGES[: last + 1]:
+            prepare(stage, work_dir)
+            ok, seconds, peak = run_stage(stage, work_dir)
+            print(f"   {stage:<20} {seconds:8.2f}s {'' if ok else 'FAILED, see ' + stage + '.log'}")
+
+            if stage in args.stages:
+                records.append({
+                    **run,
+                    "scale": scale,
+                    "stage": stage,
+                    "ok": ok,
+                    "seconds": round(seconds, 4),
+                    "rows_per_s": round(scale / seconds, 1) if seconds else None,
+                    "peak_rss_mb": round(peak, 1),
+                })
+
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.results, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+    compare(records, history)
+    print(f"\nResults appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
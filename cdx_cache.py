@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache for Wayback CDX lookups.
+
+Results are stored in SQLite keyed by (canonical URL, query params), with
+the time they were fetched. Hits ("has snapshots") and misses ("no
+snapshot") expire after separate TTLs, so re-runs of the Wayback stage
+only call the CDX API for new or stale URLs.
+"""
+
+import json
+import sqlite3
+import time
+
+# ================= CONFIG =================
+
+CDX_CACHE_DB = "cdx_cache.sqlite"
+
+CDX_TTL_DAYS = 30            # lookups that returned snapshots
+CDX_NEGATIVE_TTL_DAYS = 7    # lookups that returned no snapshot
+
+SQLITE_BATCH = 500           # max host parameters per IN (...) query
+
+# ================= HELPERS =================
+
+def query_key(params):
+    """
+    CDX params (dict or list of pairs), minus the url → stable string
+    """
+    items = params.items() if isinstance(params, dict) else params
+    return json.dumps(sorted([k, str(v)] for k, v in items if k != "url"))
+
+
+def is_negative(rows):
+    # CDX json output: header row + one row per capture
+    return not rows or len(rows) <= 1
+
+# ================= CACHE =================
+
+class CdxCache:
+    """
+    cache = CdxCache()
+    rows = cache.get(tool_id, params)      # None → not cached / expired
+    cache.put(tool_id, params, rows)
+    """
+
+    def __init__(self, path=CDX_CACHE_DB, ttl_days=CDX_TTL_DAYS,
+                 negative_ttl_days=CDX_NEGATIVE_TTL_DAYS):
+        self.ttl = ttl_days * 86400
+        self.negative_ttl = negative_ttl_days * 86400
+        self.preloaded = {}
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS cdx (
+                url TEXT NOT NULL,
+                query TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                negative INTEGER NOT NULL,
+                rows TEXT,
+                PRIMARY KEY (url, query)
+            )
+        """)
+        self.db.commit()
+
+    def _fresh(self, fetched_at, negative, now):
+        ttl = self.negative_ttl if negative else self.ttl
+        return now - fetched_at < ttl
+
+    def get(self, url, params):
+        key = query_key(params)
+
+        if (url, key) in self.preloaded:
+            return self.preloaded[(url, key)]
+
+        row = self.db.execute(
+            "SELECT fetched_at, negative, rows FROM cdx WHERE url = ? AND query = ?",
+            (url, key)
+        ).fetchone()
+
+        if row is None or not self._fresh(row[0], row[1], time.time()):
+            return None
+        return json.loads(row[2])
+
+    def preload(self, urls, params):
+        """
+        Bulk-load fresh entries for `urls` into memory → number of hits
+        """
+        key = query_key(params)
+        now = time.time()
+        urls = list(urls)
+
+        for i in range(0, len(urls), SQLITE_BATCH):
+            batch = urls[i:i + SQLITE_BATCH]
+            marks = ",".join("?" * len(batch))
+            for url, fetched_at, negative, rows in self.db.execute(
+                f"SELECT url, fetched_at, negative, rows FROM cdx "
+                f"WHERE query = ? AND url IN ({marks})",
+                [key, *batch]
+            ):
+                if self._fresh(fetched_at, negative, now):
+                    self.preloaded[(url, key)] = json.loads(rows)
+
+        return sum(1 for (_, k) in self.preloaded if k == key)
+
+    def put(self, url, params, rows):
+        key = query_key(params)
+        self.db.execute(
+            "INSERT OR REPLACE INTO cdx (url, query, fetched_at, negative, rows) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (url, key, time.time(), int(is_negative(rows)), json.dumps(rows))
+        )
+        self.db.commit()
+        self.preloaded[(url, key)] = rows
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Cell-level change log for the tool directory.
+
+Every write through directory_store is diffed against what it replaces and
+the changed cells are appended as one Parquet part per write:
+
+    tool_id | column | old | new | stage | changed_at
+
+A tool added or removed by a write is logged under the pseudo-column
+"tool_id". Parts live in a directory next to the directory file
+(new_directory.parquet → new_directory.changes/), numbered in write order.
+Blob columns are not logged.
+
+Downstream stages follow the log through a ChangeFeed: pending() returns
+the net changes since the consumer's last commit(), or None when the
+consumer has to rebuild from scratch (first run, directory rebuilt or
+written behind the log's back, inputs or outputs touched since). Parts
+every consumer has committed past are pruned.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from directory_store import DIRECTORY_PATH, atomic_write
+
+# ================= CONFIG =================
+
+LOG_SUFFIX = ".changes"
+HEAD_FILE = "head.json"        # epoch, last part, directory fingerprint
+CURSOR_FILE = "cursors.json"   # consumer → what it last committed
+
+# a tool entering / leaving the directory
+ROW_COLUMN = "tool_id"
+
+LOG_COLUMNS = ["tool_id", "column", "old", "new", "stage", "changed_at"]
+KEYS = ["tool_id", "column"]
+
+# ================= HELPERS =================
+
+def log_dir(path=DIRECTORY_PATH):
+    """
+    Directory path → its change log (new_directory.parquet →
+    new_directory.changes/)
+    """
+    path = Path(path)
+    return path.with_name(path.stem + LOG_SUFFIX)
+
+
+def fingerprint(path):
+    """
+    (size, mtime) of a file, None when it does not exist
+    """
+    try:
+        st = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _load(path, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def _save(path, data):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    atomic_write(path, write)
+
+
+def _part_seq(part):
+    return int(part.name.split("_", 1)[0])
+
+
+def _parts(logs):
+    return sorted(logs.glob("*.parquet"), key=_part_seq)
+
+
+def current_stage():
+    # the running script: exit_adder.py → "exit_adder"
+    return Path(sys.argv[0]).stem or "unknown"
+
+# ================= DIFF =================
+
+def diff(old, new):
+    """
+    Two tool_id-indexed frames → changed cells (tool_id, column, old, new)
+    over the columns of `new`, values as text; tools only in one of them
+    are logged under ROW_COLUMN
+    """
+    ids = old.index.union(new.index, sort=False)
+    in_old = ids.isin(old.index)
+    in_new = ids.isin(new.index)
+
+    parts = []
+    rows = in_old != in_new
+    if rows.any():
+        parts.append(pd.DataFrame({
+            "tool_id": ids[rows],
+            "column": ROW_COLUMN,
+            "old": pd.Series(ids[rows], dtype="string").where(in_old[rows]).to_numpy(),
+            "new": pd.Series(ids[rows], dtype="string").where(in_new[rows]).to_numpy(),
+        }))
+
+    for col in new.columns:
+        o = old[col].reindex(ids) if col in old.columns else pd.Series(pd.NA, index=ids, dtype=object)
+        n = new[col].reindex(ids)
+
+        o_na, n_na = o.isna().to_numpy(), n.isna().to_numpy()
+        both = ~o_na & ~n_na
+
+        ov, nv = o.astype(object).to_numpy(), n.astype(object).to_numpy()
+        ov[~both] = None
+        nv[~both] = None
+        changed = (o_na != n_na) | (both & (ov != nv))
+
+        # a tool added or removed is one ROW_COLUMN entry, not one per field
+        changed &= in_old & in_new
+        if changed.any():
+            parts.append(pd.DataFrame({
+                "tool_id": ids[changed],
+                "column": col,
+                "old": o[changed].astype("string").to_numpy(),
+                "new": n[changed].astype("string").to_numpy(),
+            }))
+
+    if not parts:
+        return pd.DataFrame(columns=KEYS + ["old", "new"])
+    return pd.concat(parts, ignore_index=True).astype("string")
+
+
+def net_changes(changes):
+    """
+    Log rows in write order → one row per (tool_id, column): the first old
+    and the last new value; cells that ended where they started are dropped
+    """
+    if changes.empty:
+        return changes[KEYS + ["old", "new"]]
+
+    first = changes.drop_duplicates(KEYS, keep="first").set_index(KEYS)["old"]
+    last = changes.drop_duplicates(KEYS, keep="last").set_index(KEYS)["new"]
+    net = pd.DataFrame({"old": first, "new": last.reindex(first.index)})
+
+    moved = (net["old"].isna() != net["new"].isna()) | (net["old"] != net["new"]).fillna(False)
+    return net[moved.to_numpy(dtype=bool)].reset_index()
+
+# ================= WRITE SIDE =================
+
+def record(path, changes, stage=None):
+    """
+    Append `changes` (diff() output) as one part for the directory at
+    `path`; changes=None means the directory was built from nothing, which
+    starts a new epoch and drops the old parts
+    """
+    logs = log_dir(path)
+    logs.mkdir(exist_ok=True)
+    head = _load(logs / HEAD_FILE, {"epoch": 0, "seq": 0})
+    stage = stage or current_stage()
+
+    if changes is None:
+        for part in _parts(logs):
+            part.unlink()
+        head["epoch"] += 1
+
+    elif len(changes):
+        head["seq"] += 1
+        part = changes.assign(stage=stage, changed_at=pd.Timestamp.now().floor("s"))
+        part = part.astype({"column": "category", "stage": "category"})[LOG_COLUMNS]
+        atomic_write(
+            logs / f"{head['seq']:06d}_{stage}.parquet",
+            lambda tmp: part.to_parquet(tmp, index=False, engine="pyarrow", compression="zstd"),
+        )
+
+    head["directory"] = fingerprint(path)
+    head["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    _save(logs / HEAD_FILE, head)
+    return 0 if changes is None else len(changes)
+
+
+def read_log(path=DIRECTORY_PATH, after=0):
+    """
+    Every logged change in parts numbered above `after`, in write order
+    """
+    parts = [p for p in _parts(log_dir(path)) if _part_seq(p) > after]
+    if not parts:
+        return pd.DataFrame(columns=LOG_COLUMNS)
+    return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+
+# ================= READ SIDE =================
+
+class ChangeFeed:
+    """
+    feed = ChangeFeed("missed_live", DIRECTORY_PATH, outputs=["inactive_or_old_urls.csv"])
+    changes = feed.pending(["exited", "name_changed"])
+    if changes is None:
+        ...rebuild everything...
+    else:
+        ...patch the outputs for changes["tool_id"]...
+    feed.commit()     # after the outputs are written
+    """
+
+    def __init__(self, consumer, path=DIRECTORY_PATH, inputs=(), outputs=()):
+        self.consumer = consumer
+        self.path = path
+        self.logs = log_dir(path)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.head = None
+        self.reason = None
+
+    def _files(self, paths):
+        return {str(p): fingerprint(p) for p in paths}
+
+    def pending(self, columns=None):
+        """
+        Net changes to `columns` (plus tools added / removed) since the
+        last commit(), or None when a full rebuild is needed (see .reason)
+        """
+        self.head = _load(self.logs / HEAD_FILE, None)
+        cursor = _load(self.logs / CURSOR_FILE, {}).get(self.consumer)
+
+        if self.head is None:
+            self.reason = "no change log"
+        elif cursor is None:
+            self.reason = "first run"
+        elif cursor["epoch"] != self.head["epoch"]:
+            self.reason = "directory rebuilt"
+        elif self.head.get("directory") != fingerprint(self.path):
+            self.reason = "directory written outside the log"
+        elif cursor["files"] != self._files(self.inputs + self.outputs):
+            self.reason = "inputs or outputs changed"
+        else:
+            seqs = [_part_seq(p) for p in _parts(self.logs) if _part_seq(p) > cursor["seq"]]
+            if seqs != list(range(cursor["seq"] + 1, self.head["seq"] + 1)):
+                self.reason = "log pruned"
+            else:
+                changes = read_log(self.path, after=cursor["seq"])
+                if columns is not None:
+                    changes = changes[changes["column"].isin([ROW_COLUMN, *columns])]
+                return net_changes(changes)
+
+        return None
+
+    def commit(self):
+        """
+        Mark everything logged up to pending() as consumed; prunes parts
+        no consumer still needs
+        """
+        if self.head is None:
+            self.head = _load(self.logs / HEAD_FILE, None)
+        if self.head is None:
+            return
+
+        cursors = _load(self.logs / CURSOR_FILE, {})
+        cursors[self.consumer] = {
+            "epoch": self.head["epoch"],
+            "seq": self.head["seq"],
+            "files": self._files(self.inputs + self.outputs),
+            "committed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        _save(self.logs / CURSOR_FILE, cursors)
+
+        done = min(c["seq"] for c in cursors.values() if c["epoch"] == self.head["epoch"])
+        for part in _parts(self.logs):
+            if _part_seq(part) <= done:
+                part.unlink()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Shared CSV loader on Arrow's multi-threaded CSV reader.
+
+pd.read_csv parses on one core and needs the dumps uncompressed on disk.
+Here blocks are parsed in parallel, only the requested columns are
+converted, plain files are memory-mapped and .gz / .zst / .bz2 files are
+decompressed as a stream, never to disk. A dump can be kept compressed
+under the same name: "ai_wayback_async_out_2024.csv" is found as
+"ai_wayback_async_out_2024.csv.zst" when only that exists.
+
+Parsing follows pandas' defaults (the same NA markers, True/False only for
+booleans, dates and times left as text), so frames come out as
+pd.read_csv would give them. dtype_profile.read_csv() / iter_csv() load
+through here and fall back to pandas when pyarrow is missing.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+# ================= CONFIG =================
+
+# suffix → Arrow codec; tried in this order when the plain file is missing
+COMPRESSED_SUFFIXES = {".zst": "zstd", ".gz": "gzip", ".bz2": "bz2"}
+
+# bytes per parse block; blocks are parsed on separate threads
+BLOCK_SIZE = 16 << 20
+
+# what pandas reads as missing by default
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+TRUE_VALUES = ["True", "TRUE", "true"]
+FALSE_VALUES = ["False", "FALSE", "false"]
+
+# ================= FILES =================
+
+def find_input(path):
+    """
+    `path`, or its compressed copy (path + .zst / .gz / .bz2) when only
+    that exists
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+    for suffix in COMPRESSED_SUFFIXES:
+        packed = path.with_name(path.name + suffix)
+        if packed.exists():
+            return packed
+    return path
+
+
+def plain_name(path):
+    """
+    File name without a compression suffix (x.csv.zst → x.csv)
+    """
+    name = Path(path).name
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def is_compressed(path):
+    return find_input(path).suffix in COMPRESSED_SUFFIXES
+
+
+def open_input(path):
+    """
+    Arrow input stream over `path`: memory-mapped when plain, streamed
+    through the decompressor when compressed
+    """
+    path = find_input(path)
+    codec = COMPRESSED_SUFFIXES.get(path.suffix)
+    if codec:
+        return pa.CompressedInputStream(pa.OSFile(str(path)), codec)
+    return pa.memory_map(str(path))
+
+# ================= OPTIONS =================
+
+def _read_options():
+    return pacsv.ReadOptions(use_threads=True, block_size=BLOCK_SIZE)
+
+
+def _parse_options():
+    # free text and JSON columns carry quoted newlines
+    return pacsv.ParseOptions(newlines_in_values=True)
+
+
+def _convert_options(include=None, column_types=None):
+    return pacsv.ConvertOptions(
+        include_columns=include,
+        column_types=column_types or {},
+        null_values=NA_VALUES,
+        true_values=TRUE_VALUES,
+        false_values=FALSE_VALUES,
+        strings_can_be_null=True,
+    )
+
+
+def _temporal(arrow_type):
+    return (
+        pa.types.is_date(arrow_type)
+        or pa.types.is_time(arrow_type)
+        or pa.types.is_timestamp(arrow_type)
+    )
+
+
+def _head_schema(path):
+    # column names and the types inferred from the first block
+    with open_input(path) as stream:
+        return pacsv.open_csv(
+            stream, read_options=_read_options(), parse_options=_parse_options(),
+            convert_options=_convert_options(),
+        ).schema
+
+
+def _plan(path, usecols, column_types, text_only):
+    """
+    → (columns to convert, Arrow type per column) from the header block;
+    text_only types every column not in `column_types` as text
+    """
+    head = _head_schema(path)
+
+    if usecols is None:
+        include = list(head.names)
+    elif callable(usecols):
+        include = [c for c in head.names if usecols(c)]
+    else:
+        include = [c for c in head.names if c in set(usecols)]
+
+    types = {}
+    for field in head:
+        if field.name not in include:
+            continue
+        if field.name in (column_types or {}):
+            types[field.name] = column_types[field.name]
+        elif text_only or _temporal(field.type):
+            # pandas leaves these as text
+            types[field.name] = pa.string()
+
+    return include, types
+
+
+def _to_pandas(table):
+    mapper = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+    return table.to_pandas(types_mapper=mapper.get)
+
+# ================= READERS =================
+
+def read_header(path):
+    """
+    Column names of a CSV (plain or compressed)
+    """
+    if not HAVE_ARROW:
+        return list(pd.read_csv(find_input(path), nrows=0).columns)
+    return list(_head_schema(path).names)
+
+
+def read_csv(path, usecols=None, column_types=None):
+    """
+    Whole CSV → DataFrame, parsed on all cores
+
+    `usecols` is a list or a predicate over column names; `column_types`
+    maps columns to Arrow types (everything else is inferred).
+    """
+    include, types = _plan(path, usecols, column_types, text_only=False)
+
+    with open_input(path) as stream:
+        table = pacsv.read_csv(
+            stream, read_options=_read_options(), parse_options=_parse_options(),
+            convert_options=_convert_options(include, types),
+        )
+    return _to_pandas(table)
+
+
+def iter_csv(path, chunksize, usecols=None, column_types=None):
+    """
+    CSV → DataFrames of about `chunksize` rows, streamed
+
+    Types can't be inferred across chunks, so columns without a
+    `column_types` entry are read as text.
+    """
+    include, types = _plan(path, usecols, column_types, text_only=True)
+
+    with open_input(path) as stream:
+        reader = pacsv.open_csv(
+            stream, read_options=_read_options(), parse_options=_parse_options(),
+            convert_options=_convert_options(include, types),
+        )
+
+        batches, rows = [], 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= chunksize:
+                yield _to_pandas(pa.Table.from_batches(batches))
+                batches, rows = [], 0
+
+        if batches:
+            yield _to_pandas(pa.Table.from_batches(batches))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Build the directory from every source in one pass.
+
+One ranking over the sources below (see source_precedence.py) replaces
+what used to be three scripts, each a full read/rewrite of the directory
+with its precedence hard-coded: the primary scrape with the 2025 Wayback
+dump as fallback, then the 2024 dump, then still_missing_unified.csv for
+exited tools. Which source supplied each field is written to
+PROVENANCE_PATH.
+
+The snapshot panel (see snapshot_panel.py) is built from the same chunks,
+so each dump is scanned once per run.
+"""
+
+import pandas as pd
+
+from directory_store import DIRECTORY_PATH, atomic_write, write_directory
+from directory_upsert import joined_text, release_date, text_length
+from dtype_profile import read_csv
+from json_columns import format_report
+from redirect_graph import exit_urls, resolve_redirects
+from snapshot_panel import PANEL_PATH, combine, snapshots, write_panel
+from source_precedence import DIRECT, SNAPSHOT, WAYBACK, load_source, resolve_sources
+from stage_metrics import StageMetrics
+from url_utils import canonical_url
+
+# ================= CONFIG =================
+
+INPUT_URLS_CSV = "clean_urls_3.csv"
+STATUS_CSV = "url_status_checked.csv"   # exited tools, for exited-only sources
+
+OUTPUT_DIRECTORY = DIRECTORY_PATH
+PROVENANCE_PATH = "directory_provenance.parquet"
+UNRESOLVED_CSV = "unresolved_urls.csv"  # tools no source supplied
+
+CURRENT_DATA_DATE = "2026-01-14"
+CHUNKSIZE = 200_000
+
+# versions decode counts, one per release_date() call (reported per source)
+version_reports = []
+
+FULL_MAPPING = {
+    "name": "name",
+    "release_date": release_date("versions", on_report=version_reports.append),
+    "pricing_text": joined_text(["pricing_model", "paid_options_from", "billing_frequency"]),
+    "description": "description",
+    "description_length": text_length("description"),
+    "saves": "saves",
+    "comments": "comments_json",
+    "versions": "versions",
+    "comments_count": "comments_count",
+    "views": "views",
+    "rating": "rating",
+    "ratings_count": "number_of_ratings",
+    "input_modalities": "modalities_inputs",
+    "output_modalities": "modalities_outputs",
+    "tasks": "task_label_name",
+}
+
+# the 2024 dump has no views / modalities worth keeping
+MAPPING_2024 = {
+    "name": "name",
+    "release_date": release_date("versions", on_report=version_reports.append),
+    "pricing_text": "pricing_model",
+    "description": "description",
+    "description_length": text_length("description"),
+    "saves": "saves",
+    "comments": "comments_json",
+    "versions": "versions",
+    "comments_count": "comments_count",
+    "rating": "rating",
+    "ratings_count": "number_of_ratings",
+    "tasks": "task_label_name",
+}
+
+MAPPING_EXITED = {
+    "name": "name",
+    "description": "description",
+    "description_length": text_length("description"),
+    "pricing_text": joined_text(["pricing_model", "paid_options_from", "billing_frequency", "tag_price"]),
+    "saves": "saves",
+    "rating": "rating",
+    "ratings_count": "number_of_ratings",
+    "input_modalities": "modalities_inputs",
+    "output_modalities": "modalities_outputs",
+    "tasks": "task_label_name",
+}
+
+# precedence order: earlier sources win every field they have a value for
+SOURCES = [
+    {
+        "name": "primary_2026",
+        "path": "ai_tools_progress_14012026.csv",
+        "links": DIRECT,
+        "freshness": CURRENT_DATA_DATE,
+        "mapping": FULL_MAPPING,
+    },
+    {
+        "name": "wayback_2025",
+        "path": "ai_wayback_async_out_2025.csv",
+        "links": WAYBACK,
+        "freshness": SNAPSHOT,
+        "mapping": FULL_MAPPING,
+    },
+    {
+        "name": "wayback_2024",
+        "path": "ai_wayback_async_out_2024.csv",
+        "links": WAYBACK,
+        "freshness": SNAPSHOT,
+        "mapping": MAPPING_2024,
+        "chunksize": CHUNKSIZE,
+        "columns": [
+            "link", "name", "versions", "pricing_model", "description", "saves",
+            "comments_json", "comments_count", "views", "rating", "number_of_ratings",
+            "task_label_name",
+        ],
+    },
+    {
+        "name": "still_missing_unified",
+        "path": "still_missing_unified.csv",
+        "links": WAYBACK,
+        "freshness": SNAPSHOT,
+        "mapping": MAPPING_EXITED,
+        "exited_only": True,
+    },
+]
+
+# ================= LOAD =================
+
+metrics = StageMetrics("directory_resolver")
+metrics.phase("load")
+
+urls = canonical_url(read_csv(INPUT_URLS_CSV)["url"]).dropna().drop_duplicates()
+tool_ids = pd.Index(urls, name="tool_id")
+metrics.rows_in(INPUT_URLS_CSV, len(tool_ids))
+
+try:
+    status_df = read_csv(STATUS_CSV)
+    status_df["url"] = canonical_url(status_df["url"])
+    status_df["redirected_to"] = canonical_url(status_df["redirected_to"])
+    exited = tool_ids.intersection(exit_urls(resolve_redirects(status_df)))
+except FileNotFoundError:
+    print(f"{STATUS_CSV} not found: exited-only sources are skipped")
+    exited = tool_ids[:0]
+
+candidates = []
+panel_parts = []
+for spec in SOURCES:
+    # every snapshot goes to the panel, every tool in the dump included
+    seen = len(version_reports)
+    frame = load_source(
+        spec,
+        exited if spec.get("exited_only") else tool_ids,
+        on_chunk=lambda chunk, spec=spec: panel_parts.append(snapshots(chunk, spec)),
+    )
+    candidates.append((spec["name"], frame))
+    metrics.rows_in(spec["path"], len(frame))
+    print(f"{spec['name']}: {len(frame)} tools")
+    for report in version_reports[seen:]:
+        metrics.count("versions_failed", report.failed)
+        print("  " + format_report("versions", report))
+
+# ================= RANK =================
+
+metrics.phase("match")
+
+resolved, provenance = resolve_sources(tool_ids, candidates)
+unresolved = provenance.index[provenance.isna().all(axis=1)]
+
+for name, _ in candidates:
+    metrics.count(f"fields_from_{name}", int((provenance == name).to_numpy().sum()))
+metrics.count("matched", len(tool_ids) - len(unresolved))
+metrics.count("missed", len(unresolved))
+
+# ================= WRITE =================
+
+metrics.phase("write")
+
+# comments / versions go to the blob sidecar (see directory_store)
+write_directory(resolved, OUTPUT_DIRECTORY)
+
+provenance = provenance.astype("category").reset_index()
+atomic_write(PROVENANCE_PATH, lambda tmp: provenance.to_parquet(tmp, index=False, engine="pyarrow"))
+
+pd.DataFrame({"url": unresolved}).to_csv(UNRESOLVED_CSV, index=False)
+
+panel = combine(panel_parts, SOURCES)
+write_panel(panel)
+
+metrics.rows_out(OUTPUT_DIRECTORY, len(resolved))
+metrics.rows_out(UNRESOLVED_CSV, len(unresolved))
+metrics.rows_out(PANEL_PATH, len(panel))
+
+print("✅ Directory resolved")
+print(f"Tools: {len(tool_ids)} | Exited: {len(exited)} | Unresolved: {len(unresolved)}")
+print(f"Panel: {len(panel)} snapshots of {panel['tool_id'].nunique()} tools")
+print("Fields supplied: " + ", ".join(
+    f"{name} {int((provenance == name).to_numpy().sum())}" for name, _ in candidates
+))
+metrics.finish()
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Storage layer for the tool directory.
+
+The directory lives in a Parquet file with an explicit schema, so ints stay
+ints and empty strings stay empty across stages. Stages read only the
+columns they need and every write is atomic (temp file + rename), so a run
+that dies mid-write leaves the previous directory intact.
+
+Pointing DIRECTORY_PATH at a .sqlite file switches to an embedded SQLite
+backend instead: tool_id is the primary key, the status flags and missing
+fields are indexed, filtered reads only touch matching rows and
+update_directory() is a set-based UPSERT, so enrichment stages pay for the
+rows they change rather than the whole directory.
+
+Heavy JSON blobs (BLOB_COLUMNS: the raw comments and versions) are kept
+out of the main file, in a zstd-compressed Parquet sidecar keyed by tool_id
+(blob_path()). read_directory() returns scalars and counts only unless a
+blob column is asked for by name, in which case just those blobs are loaded
+for just the rows returned.
+
+Every write and update also logs the cells it changed (see change_log.py),
+so downstream stages can follow the directory by its deltas.
+
+CSV is only produced by an explicit export (see export_directory.py).
+"""
+
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# ================= CONFIG =================
+
+DIRECTORY_PATH = "new_directory.parquet"
+EXPORT_CSV = "new_directory.csv"
+
+# column → pandas dtype; columns not listed keep their inferred dtype
+SCHEMA = {
+    "tool_id": "string",
+    "name": "string",
+    "release_date": "string",
+    "pricing_text": "string",
+    "description": "string",
+    "description_length": "Int64",
+    "saves": "Int64",
+    "comments": "string",
+    "versions": "string",
+    "comments_count": "Int64",
+    "views": "Int64",
+    "rating": "Float64",
+    "ratings_count": "Int64",
+    "input_modalities": "string",
+    "output_modalities": "string",
+    "tasks": "string",
+    "last_date": "string",
+    "exited": "Int8",
+    "name_changed": "Int8",
+    "new_name": "string",
+    "terminal_url": "string",
+    "redirect_hops": "Int64",
+}
+
+DATE_COLUMNS = ["release_date", "last_date"]
+FLAG_COLUMNS = ["exited", "name_changed"]
+
+# ---- blob sidecar ----
+
+# raw JSON, never read by the stages themselves → stored beside the directory
+BLOB_COLUMNS = ["comments", "versions"]
+BLOB_SUFFIX = ".blobs.parquet"
+BLOB_COMPRESSION = "zstd"
+
+# blobs that go into the CSV export (versions is reduced to release_date)
+EXPORT_BLOBS = ["comments"]
+
+# ---- SQLite backend ----
+
+SQLITE_SUFFIXES = (".sqlite", ".db")
+SQLITE_TABLE = "directory"
+
+# status flags and the fields enrichment stages look for (name IS NULL, ...)
+SQLITE_INDEXES = ["exited", "name_changed", "name", "release_date"]
+
+# tool_ids per IN (...) lookup, under SQLite's bound-parameter limit
+SQLITE_BATCH = 30_000
+
+# ================= FILTERS =================
+#
+# `where` filters are lists of (column, op, value) conditions that must all
+# hold, or a list of such lists (any may hold):
+#     [("exited", "=", 1)]
+#     [[("name", "=", None)], [("release_date", "=", None)]]
+# ("col", "=", None) / ("col", "!=", None) test for NULL / NOT NULL.
+
+FILTER_OPS = ("=", "!=", "<", "<=", ">", ">=", "in")
+
+
+def _clauses(where):
+    if not where:
+        return []
+    return [list(where)] if isinstance(where[0], tuple) else [list(c) for c in where]
+
+
+def _sql_where(where):
+    """
+    Filter → (" WHERE ..." or "", params)
+    """
+    ors, params = [], []
+    for clause in _clauses(where):
+        ands = []
+        for col, op, value in clause:
+            if op not in FILTER_OPS:
+                raise ValueError(f"Unknown filter op: {op}")
+            if value is None:
+                ands.append(f'"{col}" IS {"NOT " if op == "!=" else ""}NULL')
+            elif op == "in" and not len(value):
+                # an empty set matches nothing
+                ands.append("0")
+            elif op == "in":
+                ands.append(f'"{col}" IN ({", ".join("?" * len(value))})')
+                params.extend(value)
+            else:
+                ands.append(f'"{col}" {op} ?')
+                params.append(value)
+        ors.append("(" + " AND ".join(ands) + ")")
+    return (" WHERE " + " OR ".join(ors) if ors else ""), params
+
+
+def _arrow_filter(where):
+    """
+    Filter → pyarrow expression for pd.read_parquet(filters=...)
+    """
+    import pyarrow.compute as pc
+
+    compare = {
+        "=": lambda f, v: f == v, "!=": lambda f, v: f != v,
+        "<": lambda f, v: f < v, "<=": lambda f, v: f <= v,
+        ">": lambda f, v: f > v, ">=": lambda f, v: f >= v,
+        "in": lambda f, v: f.isin(list(v)),
+    }
+
+    expr = None
+    for clause in _clauses(where):
+        conj = None
+        for col, op, value in clause:
+            if op not in FILTER_OPS:
+                raise ValueError(f"Unknown filter op: {op}")
+            f = pc.field(col)
+            if value is None:
+                term = ~f.is_null() if op == "!=" else f.is_null()
+            elif op == "in" and not len(value):
+                # an empty value set is typed null and can't be compared
+                term = pc.scalar(False)
+            else:
+                term = compare[op](f, value)
+            conj = term if conj is None else conj & term
+        expr = conj if expr is None else expr | conj
+    return expr
+
+# ================= HELPERS =================
+
+def atomic_write(path, write):
+    """
+    Call write(tmp_path) on a temp file next to `path`, then rename it over
+    `path`; the temp file is removed if anything fails
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def apply_schema(df):
+    """
+    Cast known columns to their declared dtype (dates as YYYY-MM-DD text,
+    flags never null)
+    """
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns:
+            continue
+
+        values = df[col]
+
+        if col in DATE_COLUMNS:
+            parsed = pd.to_datetime(values.astype("string"), errors="coerce", format="mixed")
+            values = parsed.dt.strftime("%Y-%m-%d")
+        elif dtype.startswith("Int"):
+            values = pd.to_numeric(values, errors="coerce").astype("Float64").round()
+        elif dtype.startswith("Float"):
+            values = pd.to_numeric(values, errors="coerce")
+
+        if col in FLAG_COLUMNS:
+            values = values.fillna(0)
+
+        df[col] = values.astype(dtype)
+
+    return df
+
+
+def is_sqlite(path):
+    return Path(path).suffix in SQLITE_SUFFIXES
+
+# ================= SQLITE BACKEND =================
+
+def _sql_type(col):
+    dtype = SCHEMA.get(col, "string")
+    if dtype.startswith("Int"):
+        return "INTEGER"
+    if dtype.startswith("Float"):
+        return "REAL"
+    return "TEXT"
+
+
+def _connect(path):
+    # autocommit off: every write below is one explicit transaction
+    return sqlite3.connect(path, isolation_level=None)
+
+
+def _table_columns(db):
+    return [r[1] for r in db.execute(f'PRAGMA table_info("{SQLITE_TABLE}")')]
+
+
+def _ensure_table(db, columns):
+    db.execute(f'CREATE TABLE IF NOT EXISTS "{SQLITE_TABLE}" (tool_id TEXT PRIMARY KEY)')
+
+    existing = set(_table_columns(db))
+    for col in columns:
+        if col not in existing:
+            db.execute(f'ALTER TABLE "{SQLITE_TABLE}" ADD COLUMN "{col}" {_sql_type(col)}')
+
+    existing |= set(columns)
+    for col in SQLITE_INDEXES:
+        if col in existing:
+            db.execute(f'CREATE INDEX IF NOT EXISTS "idx_{col}" ON "{SQLITE_TABLE}" ("{col}")')
+
+
+def _rows(df, columns):
+    values = df[columns].astype(object)
+    return values.where(values.notna(), None).itertuples(index=False, name=None)
+
+
+def _sqlite_read(path, columns, where):
+    if not Path(path).exists():
+        raise FileNotFoundError(path)
+
+    db = _connect(path)
+    try:
+        cols = columns or _table_columns(db)
+        clause, params = _sql_where(where)
+        select = ", ".join(f'"{c}"' for c in cols)
+        # rowid order = directory order, whichever index the filter used
+        sql = f'SELECT {select} FROM "{SQLITE_TABLE}"{clause} ORDER BY rowid'
+        return pd.read_sql_query(sql, db, params=params)
+    finally:
+        db.close()
+
+
+def _sqlite_upsert(df, path, replace=False):
+    """
+    INSERT ... ON CONFLICT(tool_id) DO UPDATE for the columns of `df`
+    (tool_id column); replace=True swaps the whole table in the same
+    transaction
+    """
+    columns = list(df.columns)
+    db = _connect(path)
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        if replace:
+            db.execute(f'DROP TABLE IF EXISTS "{SQLITE_TABLE}"')
+        _ensure_table(db, columns)
+
+        names = ", ".join(f'"{c}"' for c in columns)
+        updates = ", ".join(f'"{c}" = excluded."{c}"' for c in columns if c != "tool_id")
+        conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+
+        db.executemany(
+            f'INSERT INTO "{SQLITE_TABLE}" ({names}) VALUES ({", ".join("?" * len(columns))}) '
+            f"ON CONFLICT(tool_id) {conflict}",
+            _rows(df, columns),
+        )
+        db.execute("COMMIT")
+    except BaseException:
+        if db.in_transaction:
+            db.execute("ROLLBACK")
+        raise
+    finally:
+        db.close()
+
+# ================= BLOB SIDECAR =================
+
+def blob_path(path=DIRECTORY_PATH):
+    """
+    Directory path → its blob sidecar (new_directory.parquet →
+    new_directory.blobs.parquet)
+    """
+    path = Path(path)
+    return path.with_name(path.stem + BLOB_SUFFIX)
+
+
+def read_blobs(columns=None, tool_ids=None, path=DIRECTORY_PATH):
+    """
+    Blob columns (default: all) of the directory at `path` → DataFrame
+    indexed by tool_id, limited to `tool_ids` when given; empty when no
+    sidecar has been written yet
+    """
+    sidecar = blob_path(path)
+    wanted = list(columns or BLOB_COLUMNS)
+
+    if not sidecar.exists():
+        return pd.DataFrame(columns=wanted, index=pd.Index([], name="tool_id", dtype="string"))
+
+    import pyarrow.parquet as pq
+
+    stored = pq.read_schema(sidecar).names
+    filters = None
+    if tool_ids is not None:
+        filters = _arrow_filter([("tool_id", "in", pd.Index(tool_ids).astype(str).tolist())])
+
+    df = pd.read_parquet(
+        sidecar, columns=["tool_id"] + [c for c in wanted if c in stored], filters=filters
+    )
+    return apply_schema(df.reindex(columns=["tool_id"] + wanted)).set_index("tool_id")
+
+
+def _write_blobs(blobs, path):
+    """
+    Store the blob columns of `blobs` (tool_id column) for exactly its
+    tools; blob columns it lacks are carried over from the old sidecar
+    """
+    kept = [c for c in BLOB_COLUMNS if c not in blobs.columns]
+    if kept:
+        old = read_blobs(kept, blobs["tool_id"], path)
+        blobs = blobs.join(old, on="tool_id")
+
+    blobs = apply_schema(blobs[["tool_id"] + BLOB_COLUMNS].copy())
+    atomic_write(
+        blob_path(path),
+        lambda tmp: blobs.to_parquet(tmp, index=False, engine="pyarrow", compression=BLOB_COMPRESSION),
+    )
+
+
+def _update_blobs(updates, path):
+    """
+    Overwrite the blob columns of `updates` (tool_id column) for its tools,
+    keeping every other tool's blobs
+    """
+    blobs = read_blobs(path=path)
+    updates = updates.set_index("tool_id")
+
+    new_ids = updates.index.difference(blobs.index)
+    if len(new_ids):
+        blobs = pd.concat([blobs, pd.DataFrame(index=pd.Index(new_ids, name="tool_id"))])
+
+    hit = blobs.index.isin(updates.index)
+    for col in updates.columns:
+        blobs[col] = updates[col].reindex(blobs.index).where(hit, blobs[col])
+
+    _write_blobs(blobs.reset_index(), path)
+
+
+def _split_blobs(df):
+    """
+    Frame with a tool_id column → (scalar columns, blob columns or None)
+    """
+    blobs = [c for c in BLOB_COLUMNS if c in df.columns]
+    if not blobs:
+        return df, None
+    return df.drop(columns=blobs), df[["tool_id"] + blobs]
+
+# ================= READ / WRITE =================
+
+def read_directory(columns=None, path=DIRECTORY_PATH, where=None, blobs=False):
+    """
+    Directory (or a column subset of it) → DataFrame indexed by tool_id
+
+    `where` keeps only matching rows (see FILTERS above); on SQLite it
+    runs against the indexes, on Parquet it is pushed into the reader.
+
+    Blob columns are only returned when listed in `columns`, or all of
+    them with blobs=True; they are read from the sidecar for the returned
+    rows only.
+    """
+    blobs = BLOB_COLUMNS if blobs else []
+    if columns is not None:
+        blobs = [c for c in columns if c in BLOB_COLUMNS]
+        columns = ["tool_id"] + [c for c in columns if c != "tool_id" and c not in BLOB_COLUMNS]
+
+    if is_sqlite(path):
+        df = _sqlite_read(path, columns, where)
+    else:
+        df = pd.read_parquet(path, columns=columns, filters=_arrow_filter(where) if where else None)
+
+    df = apply_schema(df).set_index("tool_id")
+
+    # a directory written before the sidecar existed still has them inline
+    inline = [c for c in BLOB_COLUMNS if c in df.columns]
+    if inline and columns is None:
+        df = df.drop(columns=[c for c in inline if c not in blobs])
+    blobs = [c for c in blobs if c not in df.columns]
+
+    if blobs:
+        df = df.join(read_blobs(blobs, df.index, path))
+    return df
+
+
+def _log_changes(path, old, new, stage):
+    """
+    Record the cells that went from `old` to `new` (tool_id-indexed);
+    old=None → the directory was written from scratch
+    """
+    from change_log import diff, record
+
+    record(path, None if old is None else diff(old, new), stage)
+
+
+def write_directory(df, path=DIRECTORY_PATH, stage=None):
+    """
+    Atomically replace the directory with `df` (tool_id index or column)
+
+    Blob columns in `df` replace the sidecar; without any, the sidecar is
+    left as it is. The changed cells are logged under `stage` (default:
+    the running script's name).
+    """
+    if df.index.name == "tool_id":
+        df = df.reset_index()
+
+    df, blobs = _split_blobs(apply_schema(df.copy()))
+    if blobs is not None:
+        _write_blobs(blobs, path)
+
+    old = read_directory(path=path) if Path(path).exists() else None
+    _write_directory(df, path)
+    _log_changes(path, old, df.set_index("tool_id"), stage)
+
+
+def _write_directory(df, path):
+    if is_sqlite(path):
+        _sqlite_upsert(df, path, replace=True)
+    else:
+        atomic_write(path, lambda tmp: df.to_parquet(tmp, index=False, engine="pyarrow"))
+
+
+def _read_rows(path, columns, tool_ids):
+    """
+    `columns` of just the tools in `tool_ids` (SQLite: in batches that stay
+    under the bound-parameter limit)
+    """
+    tool_ids = list(tool_ids)
+    if not is_sqlite(path):
+        return read_directory(columns, path, where=[("tool_id", "in", tool_ids)])
+
+    batches = [
+        read_directory(columns, path, where=[("tool_id", "in", tool_ids[i:i + SQLITE_BATCH])])
+        for i in range(0, len(tool_ids), SQLITE_BATCH)
+    ]
+    return pd.concat(batches) if batches else read_directory(columns, path, where=[("tool_id", "in", [])])
+
+
+def update_directory(df, path=DIRECTORY_PATH, columns=None, stage=None):
+    """
+    UPSERT the rows of `df` (tool_id-indexed) into the directory: matching
+    tools get `columns` (default: all of df's) overwritten, new tools are
+    inserted. Returns the number of rows written; the changed cells are
+    logged as in write_directory().
+
+    On SQLite only those rows are touched; on Parquet the file is rewritten.
+    """
+    if df.index.name == "tool_id":
+        df = df.reset_index()
+    df = df.drop_duplicates("tool_id", keep="last")
+
+    columns = ["tool_id"] + [c for c in (columns or df.columns) if c != "tool_id"]
+    updates, blobs = _split_blobs(apply_schema(df[columns].copy()))
+    if blobs is not None:
+        _update_blobs(blobs, path)
+
+    changed = updates.set_index("tool_id")
+
+    if is_sqlite(path):
+        old = _read_rows(path, list(changed.columns), changed.index) if Path(path).exists() else None
+        _sqlite_upsert(updates, path)
+        _log_changes(path, old, changed, stage)
+        return len(updates)
+
+    full = read_directory(path=path)
+    updates = changed
+    old = full.loc[full.index.intersection(updates.index), full.columns.intersection(updates.columns)]
+
+    new_ids = updates.index.difference(full.index)
+    if len(new_ids):
+        full = pd.concat([full, pd.DataFrame(index=pd.Index(new_ids, name="tool_id"))])
+
+    hit = full.index.isin(updates.index)
+    for col in updates.columns:
+        new = updates[col].reindex(full.index)
+        full[col] = new.where(hit, full[col]) if col in full.columns else new
+
+    _write_directory(apply_schema(full.reset_index()), path)
+    _log_changes(path, old, updates, stage)
+    return len(updates)
+
+
+def export_csv(csv_path=EXPORT_CSV, path=DIRECTORY_PATH):
+    """
+    Directory → flat CSV for the panel (also written atomically), with
+    the EXPORT_BLOBS columns joined back in
+    """
+    df = read_directory(path=path)
+    df = df.join(read_blobs(EXPORT_BLOBS, df.index, path))
+
+    # each blob back in its schema position (comments before comments_count)
+    order = list(df.columns.drop(EXPORT_BLOBS))
+    for col in EXPORT_BLOBS:
+        after = list(SCHEMA)[list(SCHEMA).index(col) + 1:]
+        nxt = next((c for c in after if c in order), None)
+        order.insert(order.index(nxt) if nxt else len(order), col)
+    df = df[order].reset_index()
+    atomic_write(csv_path, lambda tmp: df.to_csv(tmp, index=False))
+    return len(df)
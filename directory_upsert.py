@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Bulk, column-mapped upserts into the tool directory.
+
+A mapping is a dict of  target column → source column name
+                                      or callable(source_df) → Series
+
+Every target column is written with one aligned, whole-column operation
+instead of a `df.loc[tool_id, col] = ...` per tool and field.
+"""
+
+import pandas as pd
+
+from json_columns import release_dates
+
+# ================= CONFIG =================
+
+FILL_NA = "fill_na"        # only fill cells that are currently empty
+OVERWRITE = "overwrite"    # replace cells for every matched tool
+
+# ================= DERIVED FIELDS =================
+
+def release_date(col="versions", on_report=None):
+    """
+    Earliest version date from the `col` JSON; on_report(DecodeReport) gets
+    the decode counts of every call, for the stage to print or count
+    """
+    def derive(df):
+        dates, report = release_dates(df[col])
+        if on_report:
+            on_report(report)
+        return dates
+
+    return derive
+
+
+def text_length(col):
+    return lambda df: df[col].astype("string").str.len()
+
+
+def iso_date(col):
+    return lambda df: df[col].dt.strftime("%Y-%m-%d")
+
+
+def joined_text(cols, sep=" | "):
+    """
+    Non-empty values of `cols` joined in order, duplicates dropped
+    """
+    def derive(df):
+        parts = (
+            df[[c for c in cols if c in df.columns]]
+            .astype("string")
+            .apply(lambda s: s.str.strip())
+            .stack()
+            .dropna()
+        )
+        parts = parts[parts != ""].droplevel(1)
+
+        keys = pd.DataFrame({"tool": parts.index, "value": parts.to_numpy()})
+        parts = parts[~keys.duplicated().to_numpy()]
+
+        return parts.groupby(level=0, sort=False).agg(sep.join).reindex(df.index)
+
+    return derive
+
+# ================= UPSERT =================
+
+def _merge_column(current, new, take):
+    # categorical source columns can't take the directory's other values
+    if isinstance(new.dtype, pd.CategoricalDtype):
+        new = new.astype(object)
+
+    merged = new.where(take, current.to_numpy())
+
+    # unmatched rows are NaN in `new`; don't let that turn int flags into floats
+    if (
+        pd.api.types.is_integer_dtype(current.dtype)
+        and pd.api.types.is_float_dtype(merged.dtype)
+        and merged.notna().all()
+        and merged.eq(merged.round()).all()
+    ):
+        merged = merged.astype(current.dtype)
+
+    return merged
+
+
+def resolve_mapping(source, mapping):
+    """
+    source frame + mapping → frame of target columns (missing source
+    columns become empty)
+    """
+    return pd.DataFrame({
+        target: spec(source) if callable(spec) else source.get(spec)
+        for target, spec in mapping.items()
+    }, index=source.index)
+
+
+def upsert(directory, source, mapping, policy=FILL_NA):
+    """
+    Apply `mapping` from `source` onto `directory`; both indexed by tool_id.
+
+    Only tools already in the directory are touched. Returns the updated
+    directory.
+    """
+    if policy not in (FILL_NA, OVERWRITE):
+        raise ValueError(f"Unknown fill policy: {policy}")
+
+    updates = resolve_mapping(source, mapping)
+    updates = updates[updates.index.isin(directory.index)]
+    updates = updates[~updates.index.duplicated(keep="last")]
+
+    matched = directory.index.isin(updates.index)
+
+    for col in updates.columns:
+        new = updates[col].reindex(directory.index)
+
+        if col not in directory.columns:
+            directory[col] = new.where(matched)
+            continue
+
+        take = matched & directory[col].isna().to_numpy() if policy == FILL_NA else matched
+        directory[col] = _merge_column(directory[col], new, take)
+
+    return directory
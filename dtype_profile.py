@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Declared dtypes for every known CSV input.
+
+With default dtypes pd.read_csv turns every text column into Python objects
+and every count or flag into int64/float64, which on the Wayback dumps
+doubles or triples resident memory. Each known file gets a profile here:
+low-cardinality labels as categoricals, counts and flags as nullable small
+ints, URLs and free text as Arrow-backed strings, timestamps parsed.
+
+Loaders go through read_csv() / iter_csv(), which apply the profile and
+print the file's memory with default dtypes vs. with the profile. Files are
+parsed by the shared Arrow loader (csv_loader.py), so a profiled file may
+also sit compressed on disk as <name>.zst / <name>.gz.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+import csv_loader
+
+try:
+    import pyarrow  # noqa: F401
+    STRING = "string[pyarrow]"
+except ImportError:
+    STRING = "string"
+
+# ================= CONFIG =================
+
+CATEGORY = "category"
+DATE = "datetime"
+
+# columns shared by every scrape dump (primary scrape and Wayback passes)
+DUMP_DTYPES = {
+    "link": STRING,
+    "name": STRING,
+    "versions": STRING,
+    "pricing_model": CATEGORY,
+    "paid_options_from": CATEGORY,
+    "billing_frequency": CATEGORY,
+    "tag_price": CATEGORY,
+    "description": STRING,
+    "saves": "Int32",
+    "comments_json": STRING,
+    "comments_count": "Int32",
+    "views": "Int64",
+    "rating": "Float64",
+    "number_of_ratings": "Int32",
+    "modalities_inputs": CATEGORY,
+    "modalities_outputs": CATEGORY,
+    "task_label_name": CATEGORY,
+}
+
+URL_LIST_DTYPES = {"url": STRING}
+
+FLAG_DTYPES = {
+    "tool_id": STRING,
+    "exited": "Int8",
+    "name_changed": "Int8",
+    "new_name": STRING,
+}
+
+# file name → column → dtype; columns not listed keep pandas' defaults
+PROFILES = {
+    "final_panel_data_final_4.csv": {"internal_link": STRING},
+    "ai_tools_progress_14012026.csv": DUMP_DTYPES,
+    "ai_wayback_async_out_2025.csv": DUMP_DTYPES,
+    "ai_wayback_async_out_2024.csv": DUMP_DTYPES,
+    "still_missing_unified.csv": DUMP_DTYPES,
+    "clean_urls_3.csv": URL_LIST_DTYPES,
+    "url_status_checked.csv": {
+        "url": STRING,
+        "is_redirected": "boolean",
+        "redirected_to": STRING,
+        "final_status": "Int16",
+        "hops": "Int16",
+        "chain": STRING,
+        "elapsed_ms": "Float64",
+        "checked_at": DATE,
+    },
+    "missed_live.csv": FLAG_DTYPES,
+    "inactive_or_old_urls.csv": FLAG_DTYPES,
+    "taaft_tools_2015_2025.csv": {
+        "year": "float32",
+        "tool_name": STRING,
+        "tool_url": STRING,
+    },
+}
+
+# read straight into these dtypes; everything else is cast after parsing
+TEXT_DTYPES = (STRING, CATEGORY)
+
+# pd.read_csv options the Arrow loader covers; any other → pandas parses
+ARROW_OPTIONS = {"usecols", "low_memory"}
+
+# ================= HELPERS =================
+
+def profile_for(path):
+    return PROFILES.get(csv_loader.plain_name(path), {})
+
+
+def read_dtypes(profile):
+    """
+    Profile → the `dtype=` argument for pd.read_csv (text columns only)
+    """
+    return {col: dtype for col, dtype in profile.items() if dtype in TEXT_DTYPES}
+
+
+def arrow_types(profile):
+    """
+    Profile → Arrow column types for csv_loader (text columns only)
+    """
+    pa = csv_loader.pa
+    text = {STRING: pa.string(), CATEGORY: pa.dictionary(pa.int32(), pa.string())}
+    return {col: text[dtype] for col, dtype in profile.items() if dtype in text}
+
+
+def _use_arrow(kwargs):
+    return csv_loader.HAVE_ARROW and set(kwargs) <= ARROW_OPTIONS
+
+
+def _cast(values, dtype):
+    if dtype == DATE:
+        return pd.to_datetime(values, errors="coerce", format="mixed")
+
+    if dtype == "boolean":
+        try:
+            return values.astype("boolean")
+        except (TypeError, ValueError):
+            return values
+
+    numbers = pd.to_numeric(values, errors="coerce")
+    try:
+        return numbers.astype(dtype)
+    except (TypeError, ValueError):
+        # fractional values in an int column: keep them rather than fail
+        return numbers.astype("Float64")
+
+
+def _default_bytes(values, dtype):
+    # what pandas' default dtype for this column would have cost
+    if dtype in TEXT_DTYPES:
+        return int(values.astype(object).memory_usage(index=False, deep=True))
+    return int(values.memory_usage(index=False, deep=True))
+
+
+def apply_profile(df, profile):
+    """
+    Cast profiled columns of a frame read with read_dtypes(profile)
+    → (df, bytes with default dtypes, bytes with the profile)
+    """
+    before = int(df.index.memory_usage(deep=True))
+
+    for col in df.columns:
+        dtype = profile.get(col)
+        before += _default_bytes(df[col], dtype)
+
+        if dtype is not None and dtype not in TEXT_DTYPES:
+            df[col] = _cast(df[col], dtype)
+
+    return df, before, int(df.memory_usage(deep=True).sum())
+
+
+def format_memory(path, rows, before, after):
+    saved = 100 * (1 - after / before) if before else 0
+    return (
+        f"{Path(path).name}: {rows} rows, "
+        f"{before / 2**20:.1f} MiB → {after / 2**20:.1f} MiB ({saved:.0f}% saved)"
+    )
+
+# ================= LOADERS =================
+
+def read_csv(path, report=True, **kwargs):
+    """
+    pd.read_csv with the file's dtype profile applied
+    """
+    profile = profile_for(path)
+    if _use_arrow(kwargs):
+        df = csv_loader.read_csv(path, usecols=kwargs.get("usecols"), column_types=arrow_types(profile))
+    else:
+        df = pd.read_csv(csv_loader.find_input(path), dtype=read_dtypes(profile), **kwargs)
+    df, before, after = apply_profile(df, profile)
+
+    if report:
+        print(format_memory(path, len(df), before, after))
+    return df
+
+
+def iter_csv(path, chunksize, report=True, **kwargs):
+    """
+    Chunked read_csv(); memory is reported once, summed over all chunks
+    """
+    profile = profile_for(path)
+    rows = before = after = 0
+
+    if _use_arrow(kwargs):
+        chunks = csv_loader.iter_csv(
+            path, chunksize, usecols=kwargs.get("usecols"), column_types=arrow_types(profile)
+        )
+    else:
+        chunks = pd.read_csv(
+            csv_loader.find_input(path), dtype=read_dtypes(profile), chunksize=chunksize, **kwargs
+        )
+
+    for chunk in chunks:
+        chunk, b, a = apply_profile(chunk, profile)
+        rows, before, after = rows + len(chunk), before + b, after + a
+        yield chunk
+
+    if report:
+        print(format_memory(path, rows, before, after))
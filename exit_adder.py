@@ -2,59 +2,95 @@
 
 import pandas as pd
 
-DIRECTORY_CSV = "new_directory.csv"
+from directory_store import DIRECTORY_PATH, read_directory, write_directory
+from directory_upsert import OVERWRITE, upsert
+from dtype_profile import read_csv
+from redirect_graph import TOOL, exit_urls, resolve_redirects
+from stage_metrics import StageMetrics
+from url_utils import canonical_url
+
+DIRECTORY = DIRECTORY_PATH
 STATUS_CSV = "url_status_checked.csv"   # the new csv you showed
 
-OUTPUT_CSV = "new_directory.csv"  # overwrite safely
+OUTPUT_DIRECTORY = DIRECTORY_PATH  # overwrite safely (atomic)
+AUDIT_CSV = "redirect_resolution.csv"   # url, terminal_url, chain_length, terminal_kind
 
 # ---------------- LOAD ----------------
 
-dir_df = pd.read_csv(DIRECTORY_CSV)
-status_df = pd.read_csv(STATUS_CSV)
+metrics = StageMetrics("exit_adder")
+metrics.phase("load")
+
+dir_df = read_directory(path=DIRECTORY)
+status_df = read_csv(STATUS_CSV)
 
 # Normalize URLs
-def norm(u):
-    if not isinstance(u, str):
-        return None
-    return u.rstrip("/")
+status_df["url"] = canonical_url(status_df["url"])
+status_df["redirected_to"] = canonical_url(status_df["redirected_to"])
+
+metrics.rows_in(DIRECTORY, len(dir_df))
+metrics.rows_in(STATUS_CSV, len(status_df))
+
+# ---------------- RESOLVE REDIRECT CHAINS ----------------
 
-dir_df["tool_id"] = dir_df["tool_id"].apply(norm)
-status_df["url"] = status_df["url"].apply(norm)
-status_df["redirected_to"] = status_df["redirected_to"].apply(norm)
+metrics.phase("index")
 
-# Index directory for fast updates
-dir_df.set_index("tool_id", inplace=True)
+resolved = resolve_redirects(status_df)
+resolved.to_csv(AUDIT_CSV)
 
-# ---------------- APPLY LOGIC ----------------
+moved = resolved[resolved["chain_length"].fillna(0) > 0]
 
-for _, row in status_df.iterrows():
-    url = row["url"]
-    is_redirected = row.get("is_redirected")
-    redirected_to = row.get("redirected_to")
+metrics.phase("apply")
 
-    if not is_redirected or not isinstance(redirected_to, str):
-        continue
+# ---- CASE 1: Chain ends on another TOOL (rename) ----
+renamed = moved[moved["terminal_kind"] == TOOL]
+new_tools = renamed["terminal_url"].unique()
 
-    # ---- CASE 1: Redirected to another TOOL (rename) ----
-    if redirected_to.startswith("https://theresanaiforthat.com/ai/"):
+rename_updates = pd.concat([
+    # old tool (and every intermediate hop) → final tool
+    pd.DataFrame({"name_changed": 1, "new_name": renamed["terminal_url"]}),
+    # new tool
+    pd.DataFrame({"name_changed": 1, "new_name": new_tools}, index=new_tools),
+])
 
-        # old tool
-        if url in dir_df.index:
-            dir_df.loc[url, "name_changed"] = 1
-            dir_df.loc[url, "new_name"] = redirected_to
+dir_df = upsert(
+    dir_df,
+    rename_updates,
+    {"name_changed": "name_changed", "new_name": "new_name"},
+    policy=OVERWRITE
+)
 
-        # new tool
-        if redirected_to in dir_df.index:
-            dir_df.loc[redirected_to, "name_changed"] = 1
-            dir_df.loc[redirected_to, "new_name"] = redirected_to
+# ---- CASE 2: Chain ends on a TASK or /s/ page (exit) ----
+exited = exit_urls(resolved)
 
-    # ---- CASE 2: Redirected to TASK or /s/ (exit) ----
-    elif "/task/" in redirected_to or "/s/" in redirected_to:
-        if url in dir_df.index:
-            dir_df.loc[url, "exited"] = 1
+dir_df = upsert(
+    dir_df,
+    pd.DataFrame({"exited": 1}, index=exited),
+    {"exited": "exited"},
+    policy=OVERWRITE
+)
+
+# ---- AUDIT: terminal URL and hop count for every checked tool ----
+dir_df = upsert(
+    dir_df,
+    resolved,
+    {"terminal_url": "terminal_url", "redirect_hops": "chain_length"},
+    policy=OVERWRITE
+)
 
 # ---------------- WRITE ----------------
 
-dir_df.reset_index().to_csv(OUTPUT_CSV, index=False)
+metrics.phase("write")
+write_directory(dir_df, OUTPUT_DIRECTORY)
+
+metrics.count("renamed", len(renamed))
+metrics.count("exited", len(exited))
+metrics.count("matched", int(resolved.index.isin(dir_df.index).sum()))
+metrics.count("missed", int((~dir_df.index.isin(resolved.index)).sum()))
+metrics.rows_out(OUTPUT_DIRECTORY, len(dir_df))
+metrics.rows_out(AUDIT_CSV, len(resolved))
 
 print("✅ Redirect status applied successfully")
+print(f"Renamed: {len(renamed)} | Exited: {len(exited)} | "
+      f"Multi-hop: {int((moved['chain_length'] > 1).sum())} | "
+      f"Loops: {int((resolved['terminal_kind'] == 'cycle').sum())}")
+metrics.finish()
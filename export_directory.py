@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+
+from directory_store import DIRECTORY_PATH, EXPORT_CSV, export_csv
+
+# Final step: flatten the Parquet directory into the CSV used by the panel
+
+rows = export_csv(EXPORT_CSV, DIRECTORY_PATH)
+
+print(f"✅ Exported {DIRECTORY_PATH} → {EXPORT_CSV}")
+print(f"Rows: {rows}")
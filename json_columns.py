@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Shared decoding for JSON-valued columns (versions, comments_json).
+
+Each distinct string is decoded once (the dumps repeat the same blobs across
+snapshots), with orjson when it's installed. Release dates come back as a
+typed datetime64 column via vectorized date parsing, and every decode
+reports how many rows failed instead of silently returning [].
+"""
+
+from collections import namedtuple
+
+import pandas as pd
+
+try:
+    import orjson
+
+    def _loads(s):
+        return orjson.loads(s)
+
+    DECODE_ERRORS = (orjson.JSONDecodeError, TypeError)
+except ImportError:
+    import json
+
+    def _loads(s):
+        return json.loads(s)
+
+    DECODE_ERRORS = (ValueError, TypeError)
+
+# ================= HELPERS =================
+
+DecodeReport = namedtuple("DecodeReport", ["rows", "empty", "distinct", "failed"])
+
+
+def format_report(col, report):
+    return (
+        f"{col}: {report.rows} rows, {report.distinct} distinct, "
+        f"{report.empty} empty, {report.failed} failed to parse"
+    )
+
+
+def decode_column(values):
+    """
+    Series of JSON strings → (Series of decoded objects, DecodeReport)
+
+    Empty cells decode to None; unparseable cells decode to None and are
+    counted as failed.
+    """
+    values = pd.Series(values, copy=False)
+    present = values.notna()
+
+    uniques = pd.unique(values[present])
+    decoded, failed = {}, set()
+
+    for s in uniques:
+        try:
+            decoded[s] = _loads(s)
+        except DECODE_ERRORS:
+            failed.add(s)
+
+    out = values.map(decoded, na_action="ignore")
+    report = DecodeReport(
+        rows=len(values),
+        empty=int((~present).sum()),
+        distinct=len(uniques),
+        failed=int(values.isin(failed).sum()) if failed else 0,
+    )
+    return out, report
+
+
+def release_dates(versions):
+    """
+    Series of `versions` JSON ([{version, date, changelog}, ...])
+    → (datetime64 Series of the earliest date per row, DecodeReport)
+    """
+    versions = pd.Series(versions, copy=False)
+    decoded, report = decode_column(versions.reset_index(drop=True))
+
+    # one (row position, date string) pair per version entry
+    entries = decoded.dropna().explode().dropna()
+    raw = entries.map(lambda v: v.get("date") if isinstance(v, dict) else None).dropna()
+
+    dates = pd.to_datetime(raw.astype("string"), format="%Y-%m-%d", errors="coerce")
+    earliest = dates.groupby(level=0).min().reindex(range(len(versions)))
+
+    return pd.Series(earliest.to_numpy(dtype="datetime64[ns]"), index=versions.index), report
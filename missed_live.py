@@ -2,23 +2,84 @@
 
 import pandas as pd
 
-INPUT_CSV = "new_directory.csv"
+from change_log import ChangeFeed
+from directory_store import DIRECTORY_PATH, read_directory
+from stage_metrics import StageMetrics
+
+INPUT_DIRECTORY = DIRECTORY_PATH
 OUTPUT_CSV = "inactive_or_old_urls.csv"
 
-df = pd.read_csv(INPUT_CSV)
+COLUMNS = ["exited", "name_changed", "new_name"]
+
+# more changed tools than this → rebuild instead of patching
+DELTA_LIMIT = 20_000
+
+
+def flagged(df):
+    """
+    Directory rows (tool_id column) → the exited or renamed ones
+    """
+    # Normalize new_name (empty string → NaN)
+    new_name = df["new_name"].replace("", pd.NA)
+
+    return df[
+        (df["exited"] == 1) |
+        (
+            (df["name_changed"] == 1) &
+            (df["tool_id"] != new_name)
+        )
+    ]
+
+
+metrics = StageMetrics("missed_live")
+metrics.phase("load")
+
+feed = ChangeFeed("missed_live", INPUT_DIRECTORY, outputs=[OUTPUT_CSV])
+changes = feed.pending(COLUMNS)
+changed_ids = None if changes is None else changes["tool_id"].unique()
+
+if changed_ids is not None and len(changed_ids) > DELTA_LIMIT:
+    feed.reason = f"{len(changed_ids)} tools changed"
+    changed_ids = None
+
+if changed_ids is None:
+    print(f"Full rebuild ({feed.reason})")
+
+    # only flagged tools are read (indexed on the SQLite backend)
+    df = read_directory(
+        COLUMNS,
+        path=INPUT_DIRECTORY,
+        where=[[("exited", "=", 1)], [("name_changed", "=", 1)]],
+    ).reset_index()
+else:
+    print(f"Delta: {len(changed_ids)} changed tools")
+
+    # only the changed tools are re-read; the rest of the output stands
+    if len(changed_ids):
+        df = read_directory(
+            COLUMNS,
+            path=INPUT_DIRECTORY,
+            where=[("tool_id", "in", changed_ids.tolist())],
+        ).reset_index()
+    else:
+        df = pd.DataFrame(columns=["tool_id", *COLUMNS])
+    previous = pd.read_csv(OUTPUT_CSV, dtype=str)
+    metrics.count("changed", len(changed_ids))
+
+metrics.rows_in(INPUT_DIRECTORY, len(df))
+metrics.phase("match")
 
-# Normalize new_name (empty string → NaN)
-df["new_name"] = df["new_name"].replace("", pd.NA)
+filtered = flagged(df)[["tool_id"]]
 
-filtered = df[
-    (df["exited"] == 1) |
-    (
-        (df["name_changed"] == 1) &
-        (df["tool_id"] != df["new_name"])
-    )
-]
+if changed_ids is not None:
+    kept = previous[~previous["tool_id"].isin(changed_ids)]
+    filtered = pd.concat([f for f in (kept, filtered) if len(f)] or [kept], ignore_index=True)
 
-filtered[["tool_id"]].to_csv(OUTPUT_CSV, index=False)
+metrics.phase("write")
+filtered.to_csv(OUTPUT_CSV, index=False)
+metrics.rows_out(OUTPUT_CSV, len(filtered))
+feed.commit()
 
 print("✅ inactive_or_old_urls.csv created")
 print(f"Rows extracted: {len(filtered)}")
+metrics.finish()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, compressed HTML page cache.
+
+Pages are indexed by (url, snapshot), where snapshot is the 14-digit Wayback
+timestamp ("" for live pages). Each entry keeps the fetch status, response
+headers and fetch time. Bodies are zlib-compressed and stored once per
+content hash, so identical snapshots share one blob.
+
+The cache is bounded by total compressed size. When it grows past
+`max_bytes`, the least recently used entries are evicted. Writes and
+access times are committed in batches, not once per page.
+
+Async stages go through AsyncPageCache, which runs every call on one
+background thread so compression, commits and eviction stay off the event
+loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# ================= CONFIG =================
+
+PAGE_CACHE_DB = "page_cache.sqlite"
+PAGE_CACHE_MAX_BYTES = 20 * 1024 ** 3      # compressed bodies
+EVICT_TO = 0.9                             # evict down to 90% of the bound
+
+COMPRESS_LEVEL = 6
+
+# puts / last_access updates held before one commit
+COMMIT_BATCH = 200
+
+CachedPage = namedtuple("CachedPage", ["status", "headers", "html", "fetched_at"])
+StoredPage = namedtuple("StoredPage", ["url", "snapshot", "html", "fetched_at"])
+
+# ================= CACHE =================
+
+class PageCache:
+    """
+    pages = PageCache()
+    pages.put(url, status, headers, html, snapshot="20240101000000")
+    page = pages.get(url, "20240101000000")    # None → not cached
+    """
+
+    def __init__(self, path=PAGE_CACHE_DB, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.touched = {}       # (url, snapshot) → last access, not yet written
+        self.pending = 0        # puts since the last commit
+
+        # AsyncPageCache calls in from its own (single) thread
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                snapshot TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT,
+                hash TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (url, snapshot)
+            );
+            CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+            CREATE INDEX IF NOT EXISTS pages_hash ON pages (hash);
+        """)
+        self.db.commit()
+
+        self.total_bytes = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+    def get(self, url, snapshot=""):
+        row = self.db.execute(
+            "SELECT p.status, p.headers, b.body, p.fetched_at "
+            "FROM pages p LEFT JOIN blobs b ON b.hash = p.hash "
+            "WHERE p.url = ? AND p.snapshot = ?",
+            (url, snapshot)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        self.touched[(url, snapshot)] = time.time()
+        if len(self.touched) >= COMMIT_BATCH:
+            self.commit()
+
+        status, headers, body, fetched_at = row
+        html = zlib.decompress(body).decode("utf-8") if body is not None else None
+        return CachedPage(status, json.loads(headers or "{}"), html, fetched_at)
+
+    def iter_pages(self, batch=1000):
+        """
+        Every cached 200 page with a body → lists of up to `batch`
+        StoredPage, by url and snapshot; reads don't count as accesses
+        """
+        cursor = self.db.execute(
+            "SELECT p.url, p.snapshot, b.body, p.fetched_at "
+            "FROM pages p JOIN blobs b ON b.hash = p.hash "
+            "WHERE p.status = 200 ORDER BY p.url, p.snapshot"
+        )
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            yield [
+                StoredPage(url, snapshot, zlib.decompress(body).decode("utf-8"), fetched_at)
+                for url, snapshot, body, fetched_at in rows
+            ]
+
+    def put(self, url, status, headers, html, snapshot=""):
+        now = time.time()
+        digest = None
+
+        if html is not None:
+            raw = html.encode("utf-8")
+            digest = hashlib.sha256(raw).hexdigest()
+
+            exists = self.db.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if not exists:
+                body = zlib.compress(raw, COMPRESS_LEVEL)
+                self.db.execute(
+                    "INSERT INTO blobs (hash, body, size) VALUES (?, ?, ?)",
+                    (digest, body, len(body))
+                )
+                self.total_bytes += len(body)
+
+        old = self.db.execute(
+            "SELECT hash FROM pages WHERE url = ? AND snapshot = ?", (url, snapshot)
+        ).fetchone()
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages "
+            "(url, snapshot, status, headers, hash, fetched_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, snapshot, status, json.dumps(dict(headers or {})), digest, now, now)
+        )
+
+        if old and old[0] != digest:
+            self._drop_orphans([old[0]])
+
+        self.pending += 1
+        if self.pending >= COMMIT_BATCH:
+            self.commit()
+
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def commit(self):
+        """
+        Write the held access times and puts
+        """
+        if self.touched:
+            self.db.executemany(
+                "UPDATE pages SET last_access = ? WHERE url = ? AND snapshot = ?",
+                [(t, url, snapshot) for (url, snapshot), t in self.touched.items()]
+            )
+            self.touched = {}
+        self.db.commit()
+        self.pending = 0
+
+    def evict(self, target_bytes=None):
+        """
+        Drop least recently used pages until blobs fit in `target_bytes`
+        """
+        target_bytes = self.max_bytes * EVICT_TO if target_bytes is None else target_bytes
+
+        # recent reads have to count before picking victims
+        self.commit()
+
+        while self.total_bytes > target_bytes:
+            victims = self.db.execute(
+                "SELECT url, snapshot, hash FROM pages ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not victims:
+                break
+
+            self.db.executemany(
+                "DELETE FROM pages WHERE url = ? AND snapshot = ?",
+                [(u, s) for u, s, _ in victims]
+            )
+            self._drop_orphans({h for _, _, h in victims if h})
+            self.db.commit()
+
+    def _drop_orphans(self, hashes):
+        for digest in hashes:
+            if self.db.execute("SELECT 1 FROM pages WHERE hash = ? LIMIT 1", (digest,)).fetchone():
+                continue
+            row = self.db.execute("SELECT size FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if row:
+                self.db.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+                self.total_bytes -= row[0]
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+
+class AsyncPageCache:
+    """
+    pages = AsyncPageCache(PageCache())
+    page = await pages.get(url, snapshot)
+    await pages.put(url, status, headers, html, snapshot)
+
+    PageCache calls run one at a time on a background thread.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.io = ThreadPoolExecutor(1)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.io, fn, *args)
+
+    async def get(self, url, snapshot=""):
+        return await self._run(self.cache.get, url, snapshot)
+
+    async def put(self, url, status, headers, html, snapshot=""):
+        return await self._run(self.cache.put, url, status, headers, html, snapshot)
+
+    def close(self):
+        self.io.shutdown(wait=True)
+        self.cache.close()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Lightweight tool-page extraction with lxml/XPath.
+
+One libxml2 parse per page pulls every field we use (name, release date in
+the pre-2025 and 2025 layouts). Pricing, ratings and saves are not
+extracted until their selectors are checked against cached pages.
+`extract_fields` is a plain top-level function so it can run in a
+ProcessPoolExecutor, away from the fetch event loop and the GIL.
+"""
+
+from datetime import datetime
+
+from lxml import etree, html as lxml_html
+
+# ================= CONFIG =================
+
+def _cls(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+XPATHS = {
+    "name": etree.XPath(f"(//h1[{_cls('title_inner')}])[1]"),
+    # 2025+ layout: changelog entries
+    "changelog_dates": etree.XPath(f"//*[{_cls('version')}]//*[{_cls('changelog_title')}]"),
+    # pre-2025 layout: launch date in the header
+    "launch_dates": etree.XPath(f"//span[{_cls('launch_date_top')}]"),
+}
+
+CHANGELOG_DATE_FORMATS = ("%B %d, %Y",)
+LAUNCH_DATE_FORMATS = ("%Y-%m-%d", "%d %b %Y")
+
+# ================= HELPERS =================
+
+def _text(el, sep=""):
+    parts = (t.strip() for t in el.itertext())
+    return sep.join(p for p in parts if p)
+
+
+def _first_text(tree, key, sep=" "):
+    found = XPATHS[key](tree)
+    return _text(found[0], sep) if found else None
+
+
+def _parse_date(txt, formats):
+    for fmt in formats:
+        try:
+            return datetime.strptime(txt, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+# ================= EXTRACTION =================
+
+def extract_fields(html, snapshot_year=None):
+    """
+    Tool page HTML → dict(name, release)
+
+    Dates use the 2025 changelog layout unless snapshot_year < 2025.
+    """
+    fields = dict.fromkeys(["name", "release"])
+
+    if not html:
+        return fields
+
+    try:
+        tree = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return fields
+
+    # ---- NAME ----
+    name = _first_text(tree, "name")
+    if name:
+        fields["name"] = name.split(" v")[0]
+
+    # ---- RELEASE DATE ----
+    if snapshot_year is None or snapshot_year >= 2025:
+        nodes, formats = XPATHS["changelog_dates"](tree), CHANGELOG_DATE_FORMATS
+    else:
+        nodes, formats = XPATHS["launch_dates"](tree), LAUNCH_DATE_FORMATS
+
+    dates = [d for d in (_parse_date(_text(n), formats) for n in nodes) if d]
+    fields["release"] = min(dates).isoformat() if dates else None
+
+    return fields
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Redirect-graph resolution for renames and exits.
+
+url_status_checked.csv is read as a graph (url → redirected_to). Every URL
+is resolved to its terminal URL in bulk by pointer jumping (path
+compression over numpy arrays), so multi-hop chains such as A → B → C, or
+A → B → /task/..., get the same answer as their last hop.
+"""
+
+import numpy as np
+import pandas as pd
+
+from url_utils import TOOL_URL_PREFIX
+
+# ================= CONFIG =================
+
+TOOL = "tool"        # live tool page (/ai/...)
+TASK = "task"        # task page (/task/...) → exit
+SEARCH = "search"    # search page (/s/...) → exit
+OTHER = "other"
+CYCLE = "cycle"      # redirect loop, no terminal
+
+EXIT_KINDS = (TASK, SEARCH)
+
+# ================= HELPERS =================
+
+def classify(urls):
+    """
+    Series of canonical URLs → Series of TOOL / TASK / SEARCH / OTHER
+    """
+    urls = urls.astype("string")
+    kind = np.select(
+        [
+            urls.str.startswith(TOOL_URL_PREFIX).fillna(False).to_numpy(bool),
+            urls.str.contains("/task/", regex=False).fillna(False).to_numpy(bool),
+            urls.str.contains("/s/", regex=False).fillna(False).to_numpy(bool),
+        ],
+        [TOOL, TASK, SEARCH],
+        default=OTHER,
+    )
+    return pd.Series(kind, index=urls.index)
+
+
+def redirect_edges(status_df):
+    """
+    Status rows → Series url → redirected_to (later rows win, self-loops dropped)
+    """
+    redirected = (
+        status_df["is_redirected"].fillna(False).astype(bool)
+        & status_df["url"].notna()
+        & status_df["redirected_to"].notna()
+        & (status_df["url"] != status_df["redirected_to"]).fillna(False).astype(bool)
+    )
+    edges = status_df.loc[redirected, ["url", "redirected_to"]]
+    edges = edges.drop_duplicates("url", keep="last")
+    return pd.Series(edges["redirected_to"].to_numpy(), index=edges["url"].to_numpy())
+
+# ================= RESOLVE =================
+
+def resolve_redirects(status_df):
+    """
+    Status rows (url, is_redirected, redirected_to; canonical URLs)
+    → DataFrame indexed by url: terminal_url, chain_length, terminal_kind
+
+    Every URL that appears in the file (as source or target) gets a row.
+    URLs that don't redirect are their own terminal with chain_length 0.
+    """
+    edges = redirect_edges(status_df)
+
+    nodes = pd.Index(
+        pd.concat([status_df["url"], status_df["redirected_to"]]).dropna().unique()
+    )
+    n = len(nodes)
+
+    # next hop per node (self for terminals) and hops taken so far
+    nxt = np.arange(n)
+    nxt[nodes.get_indexer(edges.index)] = nodes.get_indexer(edges.to_numpy())
+    has_edge = nxt != np.arange(n)
+    hops = has_edge.astype(np.int64)
+
+    # pointer jumping: each round doubles the distance followed
+    for _ in range(max(1, int(np.ceil(np.log2(max(n, 2))))) + 1):
+        hops = hops + hops[nxt]
+        nxt = nxt[nxt]
+
+    # a real terminal has no outgoing edge; otherwise we are stuck in a loop
+    in_cycle = has_edge[nxt]
+
+    terminal = pd.Series(nodes[nxt], index=nodes, dtype="string")
+    out = pd.DataFrame({
+        "terminal_url": terminal.mask(in_cycle),
+        "chain_length": pd.Series(hops, index=nodes, dtype="Int64").mask(in_cycle),
+        "terminal_kind": classify(terminal).mask(in_cycle, CYCLE),
+    })
+    out.index.name = "url"
+    return out
+
+
+def exit_urls(resolved):
+    """
+    resolve_redirects() output → URLs whose chain ends on a task / search page
+    """
+    moved = resolved["chain_length"].fillna(0).to_numpy() > 0
+    return resolved.index[moved & resolved["terminal_kind"].isin(EXIT_KINDS).to_numpy()]
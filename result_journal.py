@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Write-ahead journal for long-running enrichment stages.
+
+Every completed result is appended as one JSON line and fsync'ed before
+the stage moves on, so a crash, Ctrl-C or network outage loses at most the
+request in flight. On restart the stage skips tool_ids already in the
+journal, then replays the whole journal into the directory in bulk.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# ================= JOURNAL =================
+
+class ResultJournal:
+    """
+    journal = ResultJournal("wayback_results.jsonl")
+    todo = [t for t in ids if t not in journal.tool_ids()]
+    journal.append(tool_id, {"name": ..., "release": ...})
+    df = journal.read_frame()       # tool_id-indexed, last record wins
+    journal.archive()               # after the results are applied
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file = None
+
+    def records(self):
+        if not self.path.exists():
+            return []
+
+        out = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    # torn last line from a crash mid-write
+                    continue
+        return out
+
+    def _ends_mid_line(self):
+        # the last run died mid-write → start appending on a fresh line
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def tool_ids(self):
+        return {r["tool_id"] for r in self.records()}
+
+    def append(self, tool_id, fields):
+        if self.file is None:
+            torn = self._ends_mid_line()
+            self.file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                self.file.write("\n")
+
+        record = {"tool_id": tool_id, **(fields or {}), "journaled_at": time.time()}
+        self.file.write(json.dumps(record, default=str) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def read_frame(self, columns=None):
+        records = self.records()
+        df = pd.DataFrame.from_records(records, columns=None if records else ["tool_id"])
+        df = df.drop_duplicates("tool_id", keep="last").set_index("tool_id")
+        return df if columns is None else df.reindex(columns=columns)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def archive(self):
+        """
+        Move the applied journal aside so the next run starts fresh
+        """
+        self.close()
+        if self.path.exists():
+            target = self.path.with_name(f"{self.path.name}.applied-{time.strftime('%Y%m%d-%H%M%S')}")
+            os.replace(self.path, target)
+            return target
+        return None
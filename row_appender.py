@@ -1,43 +1,95 @@
 import pandas as pd
 
+from change_log import ChangeFeed
+from directory_store import DIRECTORY_PATH, read_directory
+from dtype_profile import read_csv
+from stage_metrics import StageMetrics
+from url_utils import canonical_url
+
+REFERENCE_CSV = "missed_live.csv"
+LISTING_CSV = "taaft_tools_2015_2025.csv"
+OUTPUT_CSV = "listing.csv"
+
+# more changed tools than this → rebuild instead of patching
+DELTA_LIMIT = 20_000
+
+metrics = StageMetrics("row_appender")
+metrics.phase("load")
+
+# the listing is only patched while the reference list, the listing and
+# the previous output are exactly as this stage last left them
+feed = ChangeFeed(
+    "row_appender", DIRECTORY_PATH, inputs=[REFERENCE_CSV, LISTING_CSV], outputs=[OUTPUT_CSV]
+)
+changes = feed.pending(["name", "release_date"])
+changed_ids = None if changes is None else changes["tool_id"].unique()
+
+if changed_ids is not None and len(changed_ids) > DELTA_LIMIT:
+    feed.reason = f"{len(changed_ids)} tools changed"
+    changed_ids = None
+
 # Load CSVs
-reference_df = pd.read_csv("missed_live.csv")
-data_df = pd.read_csv("new_directory.csv")
-listing_df = pd.read_csv("taaft_tools_2015_2025.csv")
+reference_df = read_csv(REFERENCE_CSV)
+listing_df = read_csv(LISTING_CSV)
+
+if changed_ids is None:
+    print(f"Full rebuild ({feed.reason})")
+    data_df = read_directory(["name", "release_date"])
+else:
+    print(f"Delta: {len(changed_ids)} changed tools")
+    if len(changed_ids):
+        data_df = read_directory(["name", "release_date"], where=[("tool_id", "in", changed_ids.tolist())])
+    else:
+        # nothing relevant changed: the previous rows are written back as is
+        data_df = pd.DataFrame(columns=["name", "release_date"], index=pd.Index([], name="tool_id"))
+    # rows this stage appended last time, after the listing's own rows
+    appended = pd.read_csv(OUTPUT_CSV, dtype={"tool_name": str, "tool_url": str}).iloc[len(listing_df):]
+    metrics.count("changed", len(changed_ids))
+
+metrics.rows_in(REFERENCE_CSV, len(reference_df))
+metrics.rows_in(LISTING_CSV, len(listing_df))
+metrics.phase("match")
 
-# Ensure tool_id is string (important)
-reference_df["tool_id"] = reference_df["tool_id"].astype(str)
-data_df["tool_id"] = data_df["tool_id"].astype(str)
+# Canonical tool_id, same as the directory (important)
+reference_df["tool_id"] = canonical_url(reference_df["tool_id"])
+reference_ids = reference_df["tool_id"].dropna().drop_duplicates()
 
-new_rows = []
+if changed_ids is not None:
+    reference_ids = reference_ids[reference_ids.isin(changed_ids)]
 
-for tool_url in reference_df["tool_id"]:
-    match = data_df[data_df["tool_id"] == tool_url]
+# Keyed join: tools not in the directory are skipped
+matched = reference_ids.to_frame().join(data_df, on="tool_id", how="inner")
+metrics.count("matched", len(matched))
+metrics.count("missed", len(reference_ids) - len(matched))
 
-    if match.empty:
-        # Tool not found in data.csv → skip
-        continue
+# Anti-join: tools already in the listing are not appended again
+listed = canonical_url(listing_df["tool_url"])
+already = matched["tool_id"].isin(listed.dropna())
+metrics.count("already_listed", int(already.sum()))
+matched = matched[~already]
 
-    row = match.iloc[0]
+new_df = pd.DataFrame({
+    # year from release_date (YYYY-MM-DD)
+    "year": pd.to_numeric(matched["release_date"].str[:4], errors="coerce").astype("float64"),
+    "tool_name": matched["name"],
+    "tool_url": matched["tool_id"],
+})
 
-    # Extract year from release_date
-    try:
-        year = float(row["release_date"][:4])
-    except Exception:
-        year = None
+metrics.phase("apply")
 
-    new_rows.append({
-        "year": year,
-        "tool_name": row["name"],
-        "tool_url": row["tool_id"]
-    })
+# Delta: earlier rows of the changed tools are replaced by their new ones
+if changed_ids is not None:
+    new_df = pd.concat([appended[~appended["tool_url"].isin(changed_ids)], new_df], ignore_index=True)
 
 # Append new rows
-if new_rows:
-    new_df = pd.DataFrame(new_rows)
+if len(new_df):
     listing_df = pd.concat([listing_df, new_df], ignore_index=True)
 
 # Save back
-listing_df.to_csv("listing.csv", index=False)
+metrics.phase("write")
+listing_df.to_csv(OUTPUT_CSV, index=False)
+metrics.rows_out(OUTPUT_CSV, len(listing_df))
+feed.commit()
 
-print(f"Added {len(new_rows)} new tools to listing.csv")
+print(f"Added {len(new_df)} new tools to listing.csv")
+metrics.finish()
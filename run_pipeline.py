@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Pipeline runner with input fingerprinting and incremental re-execution.
+
+Each stage declares the files it reads and writes. A stage's fingerprint
+covers:
+    - the content hash of every input file
+    - the stage script and the repo modules it imports
+    - the script's top-level config constants (CURRENT_DATA_DATE, CHUNKSIZE, ...)
+
+A stage is skipped when its fingerprint matches the last successful run and
+its outputs are still in place. Inputs produced by an earlier stage are
+fingerprinted by the version that stage recorded, so files rewritten in
+place (new_directory.parquet) don't force every stage to re-run; when a
+stage does re-run, those inputs are restored to the version it expects.
+
+A stage that exits with INCOMPLETE_EXIT (outputs written, failed fetches
+left to retry) lets the pipeline go on but is not recorded as up to date,
+so the next run retries it.
+
+Usage:
+    python run_pipeline.py                   # run what changed
+    python run_pipeline.py --dry-run         # show what would run
+    python run_pipeline.py --force exit_adder
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from csv_loader import find_input
+from directory_store import DIRECTORY_PATH, blob_path
+from stage_metrics import INCOMPLETE_EXIT
+
+# ================= CONFIG =================
+
+REPO_DIR = Path(__file__).resolve().parent
+DIRECTORY_BLOBS = str(blob_path(DIRECTORY_PATH))
+
+STATE_FILE = ".pipeline_state.json"
+SNAPSHOT_DIR = ".pipeline_snapshots"
+
+STAGES = [
+    {
+        "name": "url_extractor",
+        "inputs": ["final_panel_data_final_4.csv"],
+        "outputs": ["clean_urls_3.csv"],
+    },
+    {
+        "name": "status_checker",
+        "inputs": ["clean_urls_3.csv"],
+        "outputs": ["url_status_checked.csv"],
+    },
+    {
+        # replaces directory_maker → append_2024 → directory_appender
+        "name": "directory_resolver",
+        "inputs": [
+            "clean_urls_3.csv",
+            "url_status_checked.csv",
+            "ai_tools_progress_14012026.csv",
+            "ai_wayback_async_out_2025.csv",
+            "ai_wayback_async_out_2024.csv",
+            "still_missing_unified.csv",
+        ],
+        "outputs": [
+            DIRECTORY_PATH,
+            DIRECTORY_BLOBS,
+            "directory_provenance.parquet",
+            "unresolved_urls.csv",
+            "snapshot_panel.parquet",
+        ],
+    },
+    {
+        "name": "add_columns",
+        "inputs": [DIRECTORY_PATH],
+        "outputs": [DIRECTORY_PATH],
+    },
+    {
+        "name": "exit_adder",
+        "inputs": [DIRECTORY_PATH, "url_status_checked.csv"],
+        "outputs": [DIRECTORY_PATH, "redirect_resolution.csv"],
+    },
+    {
+        "name": "wayback_directory_appender",
+        "inputs": [DIRECTORY_PATH],
+        "outputs": [DIRECTORY_PATH],
+    },
+    {
+        "name": "export_directory",
+        "inputs": [DIRECTORY_PATH, DIRECTORY_BLOBS],
+        "outputs": ["new_directory.csv"],
+    },
+    {
+        "name": "missed_live",
+        "inputs": [DIRECTORY_PATH],
+        "outputs": ["inactive_or_old_urls.csv"],
+    },
+    {
+        "name": "row_appender",
+        "inputs": ["missed_live.csv", DIRECTORY_PATH, "taaft_tools_2015_2025.csv"],
+        "outputs": ["listing.csv"],
+    },
+]
+
+# ================= FINGERPRINTS =================
+
+def file_hash(path, cache):
+    """
+    sha256 of a file; reuses the cached hash while size and mtime match
+    """
+    stat = Path(path).stat()
+    key = str(Path(path).resolve())
+    hit = cache.get(key)
+
+    if hit and hit["size"] == stat.st_size and hit["mtime_ns"] == stat.st_mtime_ns:
+        return hit["sha256"]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+    cache[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": h.hexdigest()}
+    return h.hexdigest()
+
+
+def script_config(source):
+    """
+    Top-level UPPER_CASE constants with literal values
+    """
+    config = {}
+    for node in ast.parse(source).body:
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name) and target.id.isupper():
+                try:
+                    config[target.id] = ast.literal_eval(node.value)
+                except ValueError:
+                    pass
+    return config
+
+
+def local_modules(source, seen=None):
+    """
+    Repo modules imported (transitively) by a script
+    """
+    seen = set() if seen is None else seen
+
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+
+        for name in names:
+            path = REPO_DIR / f"{name.split('.')[0]}.py"
+            if path.exists() and path not in seen:
+                seen.add(path)
+                local_modules(path.read_text(), seen)
+
+    return seen
+
+
+def stage_fingerprint(stage, versions, cache):
+    script = REPO_DIR / f"{stage['name']}.py"
+    source = script.read_text()
+
+    code = {
+        p.name: hashlib.sha256(p.read_bytes()).hexdigest()
+        for p in sorted(local_modules(source) | {script})
+    }
+    inputs = {
+        path: versions.get(path) or file_hash(find_input(path), cache)
+        for path in stage["inputs"]
+    }
+    config = script_config(source)
+
+    blob = json.dumps({"code": code, "inputs": inputs, "config": config}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest(), config
+
+# ================= SNAPSHOTS =================
+
+def snapshot_path(stage_name, path):
+    return Path(SNAPSHOT_DIR) / stage_name / Path(path).name
+
+
+def restore_inputs(stage, versions, producers, cache):
+    """
+    Put in-place inputs back to the version recorded by their producer
+    """
+    for path in stage["inputs"]:
+        producer = producers.get(path)
+        if producer is None or not Path(path).exists():
+            continue
+        if file_hash(path, cache) == versions.get(path):
+            continue
+
+        snap = snapshot_path(producer, path)
+        if snap.exists():
+            print(f"   restoring {path} from {producer}")
+            shutil.copy2(snap, path)
+
+# ================= MAIN =================
+
+def load_state():
+    if Path(STATE_FILE).exists():
+        return json.loads(Path(STATE_FILE).read_text())
+    return {"stages": {}, "hashes": {}}
+
+
+def save_state(state):
+    Path(STATE_FILE).write_text(json.dumps(state, indent=2, sort_keys=True, default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the directory pipeline incrementally")
+    parser.add_argument("--force", nargs="*", metavar="STAGE",
+                        help="re-run these stages (all stages if none given)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report which stages would run")
+    args = parser.parse_args()
+
+    forced = set()
+    if args.force is not None:
+        forced = set(args.force) or {s["name"] for s in STAGES}
+
+    state = load_state()
+    cache = state["hashes"]
+
+    # files rewritten in place by a later stage need a snapshot per version
+    rewritten = {}
+    for i, stage in enumerate(STAGES):
+        for path in stage["outputs"]:
+            if any(path in later["outputs"] for later in STAGES[i + 1:]):
+                rewritten.setdefault(path, set()).add(stage["name"])
+
+    versions = {}    # path → hash recorded by the latest upstream producer
+    producers = {}   # path → name of that producer
+    timings = []
+
+    for stage in STAGES:
+        name = stage["name"]
+
+        # dumps may be stored compressed (see csv_loader.find_input)
+        missing = [p for p in stage["inputs"] if p not in versions and not find_input(p).exists()]
+        if missing:
+            sys.exit(f"❌ {name}: missing inputs {missing}")
+
+        fingerprint, config = stage_fingerprint(stage, versions, cache)
+        previous = state["stages"].get(name, {})
+
+        up_to_date = (
+            name not in forced
+            and previous.get("fingerprint") == fingerprint
+            and all(p in previous.get("outputs", {}) for p in stage["outputs"])
+            and all(Path(p).exists() for p in stage["outputs"])
+        )
+
+        if up_to_date:
+            print(f"⏭  {name}: unchanged")
+            versions.update(previous["outputs"])
+            producers.update({p: name for p in stage["outputs"]})
+            timings.append((name, "skipped", 0.0))
+            continue
+
+        if args.dry_run:
+            print(f"▶  {name}: would run")
+            # downstream fingerprints can't be known without running
+            for p in stage["outputs"]:
+                versions[p] = f"pending:{name}"
+            timings.append((name, "would run", 0.0))
+            continue
+
+        print(f"▶  {name}: running")
+        restore_inputs(stage, versions, producers, cache)
+
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, str(REPO_DIR / f"{name}.py")])
+        elapsed = time.perf_counter() - start
+
+        incomplete = result.returncode == INCOMPLETE_EXIT
+        if result.returncode != 0 and not incomplete:
+            save_state(state)
+            sys.exit(f"❌ {name} failed after {elapsed:.1f}s (exit code {result.returncode})")
+
+        outputs = {p: file_hash(p, cache) for p in stage["outputs"]}
+
+        for path in stage["outputs"]:
+            if name in rewritten.get(path, ()):
+                snap = snapshot_path(name, path)
+                snap.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, snap)
+
+        state["stages"][name] = {
+            # no fingerprint → not up to date, retried on the next run
+            "fingerprint": None if incomplete else fingerprint,
+            "outputs": outputs,
+            "config": config,
+            "seconds": round(elapsed, 3),
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        save_state(state)
+
+        versions.update(outputs)
+        producers.update({p: name for p in stage["outputs"]})
+        timings.append((name, "incomplete" if incomplete else "ran", elapsed))
+        if incomplete:
+            print(f"⚠  {name}: left failures to retry; it runs again next time")
+
+    print("\n===== STAGE TIMINGS =====")
+    for name, status, seconds in timings:
+        print(f"{name:<28} {status:<10} {seconds:8.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Tool × snapshot-date panel of the metric columns → snapshot_panel.parquet
+
+The directory keeps one value per tool, from the newest snapshot. Here every
+snapshot is kept: one row per (tool_id, snapshot_date) with saves,
+comments_count, views, rating and ratings_count. A date seen in more than
+one dump keeps the row of the earlier source in SOURCES. The table is
+stored sorted by tool and date, zstd-compressed, so tool and date-range
+filters skip whole row groups.
+
+directory_resolver builds the panel from the chunks it already reads for
+the directory (load_source(on_chunk=...)), so a pipeline run scans each
+dump once. Running this script rebuilds only the panel.
+
+Queries:
+    read_panel()   column / tool / date-range subset, filtered in the reader
+    as_of()        last known value of each metric per tool at a date
+    resample()     monthly or yearly panel, values carried forward
+"""
+
+import numpy as np
+import pandas as pd
+
+from directory_store import atomic_write
+from dtype_profile import iter_csv
+from source_precedence import DIRECT, SNAPSHOT, WAYBACK
+from stage_metrics import StageMetrics
+from url_utils import canonical_url, parse_links
+
+# ================= CONFIG =================
+
+PANEL_PATH = "snapshot_panel.parquet"
+
+CURRENT_DATA_DATE = "2026-01-14"   # snapshot date of the primary scrape
+CHUNKSIZE = 200_000
+
+# panel column → dump column
+METRICS = {
+    "saves": "saves",
+    "comments_count": "comments_count",
+    "views": "views",
+    "rating": "rating",
+    "ratings_count": "number_of_ratings",
+}
+
+METRIC_DTYPES = {
+    "saves": "Int32",
+    "comments_count": "Int32",
+    "views": "Int64",
+    "rating": "Float64",
+    "ratings_count": "Int32",
+}
+
+# same spec format as source_precedence; on a date seen in several dumps,
+# the earlier source wins
+SOURCES = [
+    {
+        "name": "primary_2026",
+        "path": "ai_tools_progress_14012026.csv",
+        "links": DIRECT,
+        "freshness": CURRENT_DATA_DATE,
+    },
+    {"name": "wayback_2025", "path": "ai_wayback_async_out_2025.csv", "links": WAYBACK, "freshness": SNAPSHOT},
+    {"name": "wayback_2024", "path": "ai_wayback_async_out_2024.csv", "links": WAYBACK, "freshness": SNAPSHOT},
+    {"name": "still_missing_unified", "path": "still_missing_unified.csv", "links": WAYBACK, "freshness": SNAPSHOT},
+]
+
+# dump columns a panel needs
+USECOLS = {"link", *METRICS.values()}
+
+KEYS = ["tool_id", "snapshot_date"]
+
+# ================= BUILD =================
+
+def snapshots(chunk, spec):
+    """
+    Dump rows → panel rows (tool_id, snapshot_date, metrics, source); rows
+    without a tool, a date or any metric are dropped
+    """
+    if spec["links"] == WAYBACK:
+        links = parse_links(chunk["link"], wayback_only=True)
+        tool_id, date = links["tool_id"], links["snapshot_date"]
+    else:
+        tool_id = canonical_url(chunk["link"])
+        date = pd.Series(pd.Timestamp(spec["freshness"]), index=chunk.index)
+
+    out = pd.DataFrame({"tool_id": tool_id, "snapshot_date": date})
+    for col, src in METRICS.items():
+        # text when streamed, numbers when the dump was read whole
+        out[col] = pd.to_numeric(chunk[src], errors="coerce") if src in chunk.columns else np.nan
+    out["source"] = spec["name"]
+
+    keep = out["tool_id"].notna() & out["snapshot_date"].notna() & out[list(METRICS)].notna().any(axis=1)
+    return out[keep].drop_duplicates(KEYS, keep="first")
+
+
+def combine(parts, sources):
+    """
+    snapshots() frames in source order → deduplicated long table sorted by
+    tool and date
+    """
+    panel = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=KEYS + list(METRICS) + ["source"])
+
+    # parts are in source order → keep="first" applies the precedence
+    panel = panel.drop_duplicates(KEYS, keep="first")
+    panel = panel.sort_values(KEYS, kind="stable", ignore_index=True)
+
+    panel = panel.astype({"tool_id": "string", **METRIC_DTYPES})
+    panel["snapshot_date"] = pd.to_datetime(panel["snapshot_date"])
+    panel["source"] = pd.Categorical(panel["source"], categories=[s["name"] for s in sources])
+    return panel
+
+
+def build_panel(sources, metrics=None):
+    """
+    Stream every source once → combine()d panel
+    """
+    parts = []
+
+    for spec in sources:
+        rows = 0
+        for chunk in iter_csv(spec["path"], CHUNKSIZE, usecols=lambda c: c in USECOLS):
+            parts.append(snapshots(chunk, spec))
+            rows += len(chunk)
+        if metrics:
+            metrics.rows_in(spec["path"], rows)
+
+    return combine(parts, sources)
+
+
+def write_panel(panel, path=PANEL_PATH):
+    atomic_write(
+        path,
+        lambda tmp: panel.to_parquet(tmp, index=False, engine="pyarrow", compression="zstd"),
+    )
+
+# ================= QUERIES =================
+
+def read_panel(columns=None, tool_ids=None, start=None, end=None, path=PANEL_PATH):
+    """
+    Panel rows → long DataFrame; `columns` picks metrics, `tool_ids` and the
+    inclusive `start` / `end` dates pick rows
+    """
+    filters = []
+    if tool_ids is not None:
+        filters.append(("tool_id", "in", list(tool_ids)))
+    if start is not None:
+        filters.append(("snapshot_date", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("snapshot_date", "<=", pd.Timestamp(end)))
+
+    cols = None if columns is None else KEYS + [c for c in columns if c not in KEYS]
+    df = pd.read_parquet(path, columns=cols, filters=filters or None)
+    return df.astype({c: d for c, d in METRIC_DTYPES.items() if c in df.columns})
+
+
+def as_of(date, columns=None, tool_ids=None, panel=None, path=PANEL_PATH):
+    """
+    Value of each metric per tool at `date`: the newest non-null value from
+    a snapshot on or before it → tool_id-indexed frame; snapshot_date is the
+    tool's newest snapshot up to `date`
+
+    Reads the panel file unless a long `panel` frame is given.
+    """
+    date = pd.Timestamp(date)
+    if panel is None:
+        panel = read_panel(columns, tool_ids, end=date, path=path)
+    else:
+        panel = panel[panel["snapshot_date"] <= date]
+        if tool_ids is not None:
+            panel = panel[panel["tool_id"].isin(tool_ids)]
+
+    cols = [c for c in (columns or METRICS) if c in panel.columns]
+
+    # rows are sorted by date within each tool → last() is the newest value
+    ordered = panel.sort_values(KEYS, kind="stable")
+    return ordered[KEYS + cols].groupby("tool_id", sort=True).last()
+
+
+def resample(panel, freq="M", fill=True, end=None):
+    """
+    Long panel → one row per (tool_id, period) for pandas period alias
+    `freq` ("M" monthly, "Y" yearly): the last known value in each period
+
+    With fill=True every period from the tool's first snapshot to `end`
+    (default: the panel's last period) is present, carrying the previous
+    value forward.
+    """
+    cols = [c for c in METRICS if c in panel.columns]
+    ordered = panel.sort_values(KEYS, kind="stable")
+    period = ordered["snapshot_date"].dt.to_period(freq).rename("period")
+
+    out = ordered[cols].groupby([ordered["tool_id"], period], sort=True).last()
+    if not fill or out.empty:
+        return out
+
+    periods = pd.PeriodIndex(out.index.get_level_values("period"))
+    last = pd.Period(end, freq) if end is not None else periods.max()
+
+    first = pd.Series(periods, index=out.index.get_level_values("tool_id")).groupby(level=0).min()
+    first_periods = pd.PeriodIndex(first.array)
+    spans = np.clip(last.ordinal - first_periods.asi8 + 1, 0, None)
+
+    # tool i gets periods first[i], first[i] + 1, ..., last
+    offsets = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+    full = pd.MultiIndex.from_arrays(
+        [first.index.repeat(spans), first_periods.repeat(spans) + offsets],
+        names=["tool_id", "period"],
+    )
+    return out.reindex(full).groupby(level="tool_id").ffill()
+
+# ================= MAIN =================
+
+def main():
+    metrics = StageMetrics("snapshot_panel")
+
+    metrics.phase("load")
+    panel = build_panel(SOURCES, metrics)
+
+    metrics.phase("write")
+    write_panel(panel)
+    metrics.rows_out(PANEL_PATH, len(panel))
+    metrics.count("tools", panel["tool_id"].nunique())
+
+    print("✅ Snapshot panel built")
+    if len(panel):
+        print(f"Tools: {panel['tool_id'].nunique()} | Snapshots: {len(panel)} | "
+              f"{panel['snapshot_date'].min():%Y-%m-%d} → {panel['snapshot_date'].max():%Y-%m-%d}")
+        print("Rows per source: " + ", ".join(
+            f"{name} {n}" for name, n in panel["source"].value_counts(sort=False).items()
+        ))
+    metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Multi-source precedence resolution for directory fields.
+
+Each source is a dict:
+    name        label recorded as provenance
+    path        CSV dump
+    links       "direct" (tool URL in `link`) or "wayback" (web.archive.org links)
+    freshness   date string for direct sources; "snapshot" for Wayback ones
+    mapping     directory column → dump column or callable (as in directory_upsert)
+    chunksize   optional, stream the dump in chunks
+    columns     optional, dump columns to read
+
+Sources are listed in precedence order. Every source is reduced to one row
+per tool (the newest snapshot for Wayback dumps), all candidate rows are
+stacked and ranked by (source order, freshness), and each field takes the
+first non-empty value in rank order: one vectorized pass for every tool and
+field. A parallel frame records which source supplied each field.
+"""
+
+import numpy as np
+import pandas as pd
+
+from directory_upsert import resolve_mapping
+from dtype_profile import iter_csv, read_csv
+from url_utils import canonical_url
+from wayback_index import latest_snapshots, merge_latest
+
+# ================= CONFIG =================
+
+DIRECT = "direct"
+WAYBACK = "wayback"
+SNAPSHOT = "snapshot"
+
+# ================= LOAD =================
+
+def _latest_direct(df, tool_ids):
+    df = df.assign(link=canonical_url(df["link"]))
+    df = df[df["link"].isin(tool_ids)].drop_duplicates("link", keep="first")
+    return df.set_index(pd.Index(df["link"], name="tool_id")).drop(columns="link")
+
+
+def _latest(spec, df, tool_ids):
+    if spec["links"] == WAYBACK:
+        return latest_snapshots(df, tool_ids=tool_ids)
+    return _latest_direct(df, tool_ids)
+
+
+def load_source(spec, tool_ids, on_chunk=None):
+    """
+    Source spec + the tools it may supply → tool_id-indexed frame of the
+    mapped directory columns, plus `last_date` and `_freshness`
+
+    on_chunk(frame) sees every dump row as read, before the reduction to
+    the newest row per tool, so other tables can be built off the same scan.
+    """
+    tool_ids = pd.Index(tool_ids)
+    usecols = (lambda c: c in spec["columns"]) if spec.get("columns") else None
+
+    if spec.get("chunksize"):
+        rows = None
+        for chunk in iter_csv(spec["path"], spec["chunksize"], usecols=usecols, low_memory=False):
+            if on_chunk:
+                on_chunk(chunk)
+            hits = _latest(spec, chunk, tool_ids)
+            if spec["links"] == DIRECT:
+                rows = hits if rows is None else pd.concat([rows, hits[~hits.index.isin(rows.index)]])
+            else:
+                rows = hits if rows is None else merge_latest(rows, hits)
+    else:
+        df = read_csv(spec["path"], usecols=usecols, low_memory=False)
+        if on_chunk:
+            on_chunk(df)
+        rows = _latest(spec, df, tool_ids)
+
+    if rows is None or rows.empty:
+        return pd.DataFrame(columns=list(spec["mapping"]) + ["last_date", "_freshness"])
+
+    if spec["freshness"] == SNAPSHOT:
+        freshness = rows["snapshot_date"]
+    else:
+        freshness = pd.Series(pd.Timestamp(spec["freshness"]), index=rows.index)
+
+    out = resolve_mapping(rows, spec["mapping"])
+    out["last_date"] = freshness.dt.strftime("%Y-%m-%d")
+    out["_freshness"] = freshness
+    return out
+
+# ================= RESOLVE =================
+
+def _blank_to_na(df):
+    # an empty string never wins over a real value from a lower source
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype):
+            df[col] = df[col].mask(df[col].astype("string").str.strip() == "")
+    return df
+
+
+def resolve_sources(tool_ids, candidates):
+    """
+    tool_ids + [(source name, load_source() frame), ...] in precedence order
+    → (resolved fields, provenance), both indexed by tool_id in `tool_ids`
+    order; provenance holds the source name behind every non-empty field
+    """
+    tool_ids = pd.Index(tool_ids, name="tool_id")
+    fields = list(dict.fromkeys(c for _, f in candidates for c in f.columns if c != "_freshness"))
+
+    columns = fields + ["_freshness", "_rank", "_source"]
+    stacked = pd.concat(
+        [
+            f.assign(_rank=rank, _source=name)
+            for rank, (name, f) in enumerate(candidates)
+            if len(f)
+        ] or [pd.DataFrame(columns=columns)],
+    ).reindex(columns=columns)
+    stacked.index.name = "tool_id"
+    stacked = _blank_to_na(stacked)
+
+    # precedence first, then the freshest row within a source
+    stacked = stacked.sort_values(["_rank", "_freshness"], ascending=[True, False], kind="stable")
+
+    values = stacked[fields]
+    sources = pd.DataFrame(
+        np.where(values.notna().to_numpy(), stacked[["_source"]].to_numpy(), None),
+        index=stacked.index,
+        columns=fields,
+    )
+
+    # groupby().first() takes the first non-null value per tool and column
+    resolved = values.groupby(level=0, sort=False).first().reindex(tool_ids)
+    provenance = sources.groupby(level=0, sort=False).first().reindex(tool_ids)
+
+    return resolved, provenance
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Per-run metrics for pipeline stages.
+
+A stage marks its phases (load, index, match, apply, write) as it goes and
+counts rows in/out and matches/misses; network stages hand the recorder to
+Fetcher, which adds per-pool latency histograms, retry counts and the
+status-code breakdown. One JSON file per run lands in metrics/, so two runs
+of a stage can be diffed phase by phase.
+
+    metrics = StageMetrics("exit_adder")
+    metrics.phase("load")
+    ...
+    metrics.rows_in(STATUS_CSV, len(status_df))
+    metrics.phase("apply")
+    ...
+    metrics.count("exited", len(exited))
+    metrics.finish()
+
+If the stage dies before finish(), the file is still written, with
+status "incomplete".
+"""
+
+import atexit
+import bisect
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+# ================= CONFIG =================
+
+METRICS_DIR = "metrics"
+
+# exit code of a stage that wrote usable outputs but left work (failed
+# fetches) for a re-run; run_pipeline carries on and runs it again next
+# time (EX_TEMPFAIL)
+INCOMPLETE_EXIT = 75
+
+# request latency histogram upper bounds, seconds
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+# ================= HELPERS =================
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 4)
+
+# ================= NETWORK =================
+
+class PoolMetrics:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.retries = 0
+
+    def summary(self):
+        lat = sorted(self.latencies)
+        histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        for s in lat:
+            histogram[bisect.bisect_left(LATENCY_BUCKETS, s)] += 1
+
+        labels = [f"<={b}s" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return {
+            "requests": len(lat),
+            "retries": self.retries,
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency_p50": _quantile(lat, 0.5),
+            "latency_p90": _quantile(lat, 0.9),
+            "latency_p99": _quantile(lat, 0.99),
+            "latency_histogram": dict(zip(labels, histogram)),
+        }
+
+# ================= STAGE =================
+
+class StageMetrics:
+    def __init__(self, stage, out_dir=METRICS_DIR):
+        self.stage = stage
+        self.out_dir = Path(out_dir)
+        self.started_at = time.time()
+
+        self.phases = {}
+        self.current = None
+        self.phase_start = None
+
+        self.inputs = {}
+        self.outputs = {}
+        self.counters = Counter()
+        self.pools = defaultdict(PoolMetrics)
+
+        self.path = None
+        atexit.register(self._write_on_exit)
+
+    # ---- phases ----
+
+    def phase(self, name):
+        """
+        Start phase `name`, ending the current one
+        """
+        self._close_phase()
+        self.current = name
+        self.phase_start = time.perf_counter()
+
+    def _close_phase(self):
+        if self.current is None:
+            return
+        entry = self.phases.setdefault(self.current, {"seconds": 0.0})
+        entry["seconds"] = round(entry["seconds"] + time.perf_counter() - self.phase_start, 4)
+        entry["peak_rss_mb"] = peak_rss_mb()
+        self.current = None
+
+    # ---- counts ----
+
+    def rows_in(self, name, rows):
+        self.inputs[str(name)] = int(rows)
+
+    def rows_out(self, name, rows):
+        self.outputs[str(name)] = int(rows)
+
+    def count(self, name, n=1):
+        self.counters[name] += int(n)
+
+    # ---- network (called by Fetcher) ----
+
+    def request(self, pool, seconds, status):
+        """
+        One HTTP attempt; status None for connection errors / timeouts
+        """
+        m = self.pools[pool]
+        m.latencies.append(seconds)
+        m.statuses["error" if status is None else str(status)] += 1
+
+    def retry(self, pool):
+        self.pools[pool].retries += 1
+
+    # ---- output ----
+
+    def to_dict(self, status):
+        return {
+            "stage": self.stage,
+            "status": status,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "seconds": round(time.time() - self.started_at, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "phases": self.phases,
+            "rows_in": self.inputs,
+            "rows_out": self.outputs,
+            "counts": dict(self.counters),
+            "network": {pool: m.summary() for pool, m in self.pools.items()},
+        }
+
+    def finish(self, status="ok"):
+        """
+        End the current phase and write metrics/<stage>_<timestamp>.json
+        """
+        self._close_phase()
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        self.path = self.out_dir / f"{self.stage}_{stamp}.json"
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(status), f, indent=2, default=str)
+
+        print(f"Metrics: {self.path}")
+        return self.path
+
+    def _write_on_exit(self):
+        if self.path is None:
+            self.finish(status="incomplete")
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Live status check for every tool URL → url_status_checked.csv
+
+The tools are read from clean_urls_3.csv, the same set the directory is
+built from, so the check can run before the directory exists and feed both
+directory_resolver.py (exited-only sources) and exit_adder.py.
+
+Each tool URL is requested with HEAD (GET when the server refuses HEAD)
+without following redirects; every Location hop is followed by hand, so the
+full chain, the final status and the time taken are recorded. Requests go
+through one pooled Fetcher and a per-host rate limit.
+
+Results are journaled as they arrive; a rerun skips URLs already checked
+and retries the ones that failed. The CSV is rewritten from the journal at
+the end, with the url / is_redirected / redirected_to columns exit_adder.py
+reads plus the audit columns. A URL whose check failed keeps its row from
+the previous CSV, and the stage exits with INCOMPLETE_EXIT so run_pipeline
+runs it again; with no status at all the old CSV is left alone.
+"""
+
+import asyncio
+import sys
+import time
+from urllib.parse import urljoin, urlsplit
+
+import pandas as pd
+from tqdm import tqdm
+
+from async_fetcher import Fetcher
+from directory_store import atomic_write
+from dtype_profile import read_csv
+from result_journal import ResultJournal
+from stage_metrics import INCOMPLETE_EXIT, StageMetrics
+from url_utils import canonical_url
+
+# ================= CONFIG =================
+
+INPUT_URLS_CSV = "clean_urls_3.csv"
+OUTPUT_CSV = "url_status_checked.csv"
+
+# every finished check is journaled; a rerun skips URLs already in it
+JOURNAL_PATH = "status_results.jsonl"
+HEADERS = {"User-Agent": "DirectoryBot/FINAL"}
+
+POOL_LIMITS = {"status": 32}
+
+# requests per second to any one host
+HOST_RATE = 20
+
+TIMEOUT = 20
+MAX_REDIRECTS = 10
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# servers that don't support HEAD → retry the hop with GET
+HEAD_REFUSED = (403, 405, 501)
+
+# ================= RATE LIMIT =================
+
+class HostRateLimiter:
+    """
+    Spaces requests to the same host at least 1 / rate seconds apart
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = {}
+
+    async def wait(self, url):
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        slot = max(now, self.next_slot.get(host, now))
+        self.next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+# ================= CHECK =================
+
+async def hop(fetcher, limiter, url):
+    """
+    One request without following redirects → (status, headers)
+    """
+    await limiter.wait(url)
+    status, _, headers = await fetcher.request(
+        "status", url, timeout=TIMEOUT, method="HEAD", allow_redirects=False
+    )
+
+    if status in HEAD_REFUSED:
+        await limiter.wait(url)
+        status, _, headers = await fetcher.request(
+            "status", url, timeout=TIMEOUT, method="GET", allow_redirects=False
+        )
+
+    return status, headers
+
+
+async def check(fetcher, limiter, url):
+    """
+    Follow the redirect chain of `url` → (url, fields), fields None when a
+    hop failed outright
+    """
+    start = time.perf_counter()
+    chain = [url]
+
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            status, headers = await hop(fetcher, limiter, chain[-1])
+            if status is None:
+                return url, None
+
+            location = headers.get("Location")
+            if status not in REDIRECT_STATUSES or not location:
+                break
+
+            target = urljoin(chain[-1], location)
+            looped = target in chain
+            chain.append(target)
+            if looped:
+                break
+
+    except Exception:
+        return url, None
+
+    return url, {
+        "final_url": chain[-1],
+        "final_status": status,
+        "hops": len(chain) - 1,
+        "chain": chain,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+async def check_all(urls, journal, metrics):
+    limiter = HostRateLimiter(HOST_RATE)
+
+    async with Fetcher(POOL_LIMITS, headers=HEADERS, metrics=metrics) as fetcher:
+        jobs = [check(fetcher, limiter, u) for u in urls]
+
+        for job in tqdm(asyncio.as_completed(jobs), total=len(jobs), desc="STATUS"):
+            url, fields = await job
+            if fields is None:
+                # not journaled → retried on the next run
+                metrics.count("failed")
+                continue
+            journal.append(url, fields)
+            metrics.count("checked")
+
+# ================= OUTPUT =================
+
+def status_frame(journal):
+    """
+    Journal → url_status_checked.csv rows
+
+    A hop that only changes the URL's spelling (trailing slash, http) is not
+    a redirect; is_redirected compares canonical URLs.
+    """
+    df = journal.read_frame(
+        columns=["final_url", "final_status", "hops", "chain", "elapsed_ms", "journaled_at"]
+    ).reset_index()
+
+    final = canonical_url(df["final_url"])
+    redirected = (final != canonical_url(df["tool_id"])).fillna(False).astype(bool)
+
+    return pd.DataFrame({
+        "url": df["tool_id"],
+        "is_redirected": redirected,
+        "redirected_to": df["final_url"].where(redirected),
+        "final_status": df["final_status"].astype("Int16"),
+        "hops": df["hops"].astype("Int16"),
+        "chain": df["chain"].map(lambda c: " -> ".join(c) if isinstance(c, list) else None),
+        "elapsed_ms": df["elapsed_ms"],
+        "checked_at": pd.to_datetime(df["journaled_at"], unit="s").dt.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+
+
+def previous_rows(urls):
+    """
+    Rows of the existing CSV for `urls` (the ones this run has no result
+    for), so failed checks never drop what an earlier run found
+    """
+    try:
+        old = pd.read_csv(OUTPUT_CSV, dtype=str)
+    except FileNotFoundError:
+        return None
+    old = old[old["url"].isin(urls)]
+    return old.assign(is_redirected=old["is_redirected"].eq("True"))
+
+# ================= MAIN =================
+
+def main():
+    metrics = StageMetrics("status_checker")
+
+    metrics.phase("load")
+    urls = canonical_url(read_csv(INPUT_URLS_CSV)["url"]).dropna().drop_duplicates().tolist()
+    metrics.rows_in(INPUT_URLS_CSV, len(urls))
+
+    # ---- RESUME ----
+    journal = ResultJournal(JOURNAL_PATH)
+    done = journal.tool_ids()
+    todo = [u for u in urls if u not in done]
+
+    print(f"TO CHECK: {len(todo)} | JOURNALED: {len(done)}")
+    metrics.count("journaled", len(done))
+
+    # ---- CHECK ----
+    metrics.phase("match")
+    try:
+        asyncio.run(check_all(todo, journal, metrics))
+    finally:
+        journal.close()
+
+    # ---- WRITE (from the journal) ----
+    metrics.phase("write")
+    out = status_frame(journal)
+    failed = pd.Index(urls).difference(out["url"])
+
+    if urls and out.empty:
+        metrics.finish(status="failed")
+        sys.exit(f"❌ No URL could be checked; {OUTPUT_CSV} left as it was")
+
+    kept = previous_rows(failed)
+    if kept is not None and len(kept):
+        out = pd.concat([out, kept.reindex(columns=out.columns)], ignore_index=True)
+        metrics.count("kept_previous", len(kept))
+
+    atomic_write(OUTPUT_CSV, lambda tmp: out.to_csv(tmp, index=False))
+    metrics.rows_out(OUTPUT_CSV, len(out))
+
+    if len(failed) == 0:
+        journal.archive()
+
+    print("✅ DONE")
+    print(f"Rows: {len(out)} | Redirected: {int(out['is_redirected'].sum())} | "
+          f"Failed (re-run to retry): {len(failed)}")
+    metrics.finish(status="ok" if len(failed) == 0 else "partial")
+
+    if len(failed):
+        sys.exit(INCOMPLETE_EXIT)
+
+
+if __name__ == "__main__":
+    main()
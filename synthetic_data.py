@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Synthetic pipeline inputs at configurable scale.
+
+Writes every file the stages read, shaped like the real dumps:
+    final_panel_data_final_4.csv      panel rows with direct and Wayback links
+    clean_urls_3.csv                  tool URLs
+    ai_tools_progress_14012026.csv    primary scrape (~70% of tools)
+    ai_wayback_async_out_2025.csv     Wayback snapshots, 1-3 per tool
+    ai_wayback_async_out_2024.csv     Wayback snapshots, 1-3 per tool
+    still_missing_unified.csv         older Wayback snapshots
+    url_status_checked.csv            redirect chains, exits, a few loops
+    taaft_tools_2015_2025.csv         listing
+
+Usage:
+    python synthetic_data.py OUT_DIR --tools 100000
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from url_utils import TOOL_URL_PREFIX
+
+# ================= CONFIG =================
+
+SITE = "https://theresanaiforthat.com"
+WAYBACK_PREFIX = "https://web.archive.org/web/"
+
+PRIMARY_SHARE = 0.7
+WAYBACK_SHARE = 0.5
+STILL_MISSING_SHARE = 0.1
+LISTING_SHARE = 0.5
+
+RENAME_SHARE = 0.05
+EXIT_SHARE = 0.05
+LOOP_SHARE = 0.001
+MAX_HOPS = 3
+
+PANEL_ROWS_PER_TOOL = 3
+TEXT_POOL = 5000        # distinct descriptions / comment blobs to draw from
+
+WORDS = (
+    "ai assistant image video text generator writing code chat voice music "
+    "design marketing seo email resume data analysis research summarize "
+    "translate avatar logo presentation sales support productivity agent"
+).split()
+
+PRICING_MODELS = ["Free", "Freemium", "Paid", "Free Trial", "Contact for Pricing"]
+BILLING = ["Monthly", "Yearly", "One-time", None]
+PAID_FROM = ["$5", "$9", "$10", "$19", "$29", "$49", "$99", None]
+MODALITIES = ["Text", "Image", "Video", "Audio", "Code", "Text, Image"]
+TASKS = ["Writing", "Images", "Coding", "Chatbots", "Video editing", "SEO", "Music", "Research"]
+
+# ================= HELPERS =================
+
+def _pick(rng, values, n):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def _sentences(rng, n, low, high):
+    return [" ".join(rng.choice(WORDS, rng.integers(low, high))) for _ in range(n)]
+
+
+def _versions(rng, n):
+    """
+    One versions JSON blob per tool, 1-4 entries with dates in 2019-2025
+    """
+    counts = rng.integers(1, 5, n)
+    days = pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 7 * 365, counts.sum()), unit="D")
+    dates = iter(days.strftime("%Y-%m-%d"))
+
+    out = []
+    for c in counts:
+        out.append(json.dumps([
+            {"version": f"1.{k}", "date": next(dates), "changelog": "fixes and improvements"}
+            for k in range(c)
+        ]))
+    return np.array(out, dtype=object)
+
+
+def _timestamps(rng, year, n):
+    start = pd.Timestamp(f"{year}-01-01")
+    seconds = rng.integers(0, 365 * 86400, n)
+    return (start + pd.to_timedelta(seconds, unit="s")).strftime("%Y%m%d%H%M%S").to_numpy(dtype=object)
+
+
+def tool_attributes(rng, n):
+    """
+    Per-tool fields shared by every dump the tool appears in
+    """
+    slugs = pd.Series(_pick(rng, WORDS, n)) + "-" + pd.Series(_pick(rng, WORDS, n)) + "-" + pd.Series(np.arange(n)).astype(str)
+    descriptions = np.array(_sentences(rng, TEXT_POOL, 5, 60), dtype=object)
+    comments = np.array(
+        [json.dumps([{"author": f"user{j}", "text": s} for j, s in enumerate(_sentences(rng, k % 4, 3, 15))])
+         for k in range(TEXT_POOL)],
+        dtype=object,
+    )
+    comment_pick = rng.integers(0, TEXT_POOL, n)
+
+    return pd.DataFrame({
+        "url": TOOL_URL_PREFIX + slugs,
+        "name": slugs.str.replace("-", " ").str.title(),
+        "versions": _versions(rng, n),
+        "pricing_model": _pick(rng, PRICING_MODELS, n),
+        "paid_options_from": _pick(rng, PAID_FROM, n),
+        "billing_frequency": _pick(rng, BILLING, n),
+        "tag_price": _pick(rng, [None, "Free", "From $5/mo", "$29"], n),
+        "description": descriptions[rng.integers(0, TEXT_POOL, n)],
+        "saves": rng.zipf(1.6, n).clip(max=100_000),
+        "comments_json": comments[comment_pick],
+        "comments_count": comment_pick % 4,
+        "views": rng.zipf(1.4, n).clip(max=10_000_000),
+        "rating": rng.integers(30, 51, n) / 10,
+        "number_of_ratings": rng.zipf(2.0, n).clip(max=10_000),
+        "modalities_inputs": _pick(rng, MODALITIES, n),
+        "modalities_outputs": _pick(rng, MODALITIES, n),
+        "task_label_name": _pick(rng, TASKS, n),
+    })
+
+
+def dump(rng, tools, idx, links):
+    """
+    Dump rows for tools[idx] with the given links; counters drift a little
+    between snapshots
+    """
+    df = tools.iloc[idx].drop(columns="url").reset_index(drop=True)
+    df.insert(0, "link", links)
+    df["saves"] = (df["saves"] * rng.uniform(0.8, 1.0, len(df))).astype(int)
+    df["views"] = (df["views"] * rng.uniform(0.8, 1.0, len(df))).astype(int)
+    return df
+
+
+def wayback_dump(rng, tools, idx, year):
+    """
+    1-3 snapshots per tool in `year`, some with a trailing slash
+    """
+    idx = np.repeat(idx, rng.integers(1, 4, len(idx)))
+    urls = tools["url"].to_numpy(dtype=object)[idx]
+    slash = np.where(rng.random(len(idx)) < 0.3, "/", "")
+    links = WAYBACK_PREFIX + _timestamps(rng, year, len(idx)) + "/" + urls + slash
+    return dump(rng, tools, idx, links)
+
+
+def panel(rng, tools):
+    n = len(tools)
+    idx = rng.integers(0, n, n * PANEL_ROWS_PER_TOOL)
+    urls = tools["url"].to_numpy(dtype=object)[idx]
+
+    wayback = rng.random(len(idx)) < 0.4
+    links = np.where(
+        wayback,
+        WAYBACK_PREFIX + _timestamps(rng, 2024, len(idx)) + "/" + urls + "/",
+        urls + np.where(rng.random(len(idx)) < 0.5, "/", ""),
+    )
+
+    # non-tool pages the extractor has to drop
+    other = rng.random(len(idx)) < 0.05
+    links[other] = SITE + "/s/" + _pick(rng, WORDS, other.sum()) + "/"
+
+    return pd.DataFrame({
+        "internal_link": links,
+        "tool_name": tools["name"].to_numpy(dtype=object)[idx],
+        "snippet": np.array(_sentences(rng, 200, 3, 20), dtype=object)[rng.integers(0, 200, len(idx))],
+    })
+
+
+def redirect_status(rng, tools):
+    """
+    url, is_redirected, redirected_to for every tool, plus the intermediate
+    hops of multi-hop chains
+    """
+    n = len(tools)
+    urls = tools["url"].to_numpy(dtype=object)
+    kind = rng.random(n)
+    rename = kind < RENAME_SHARE
+    exit_ = (kind >= RENAME_SHARE) & (kind < RENAME_SHARE + EXIT_SHARE)
+    loop = (kind >= RENAME_SHARE + EXIT_SHARE) & (kind < RENAME_SHARE + EXIT_SHARE + LOOP_SHARE)
+
+    sources, targets = [], []
+    hops = rng.integers(1, MAX_HOPS + 1, n)
+
+    for i in np.flatnonzero(rename | exit_):
+        chain = [urls[i]] + [f"{urls[i]}-v{h + 2}" for h in range(hops[i] - 1)]
+        if rename[i]:
+            chain.append(f"{urls[i]}-new")
+        else:
+            chain.append(f"{SITE}/task/{TASKS[i % len(TASKS)].lower().replace(' ', '-')}/"
+                         if i % 2 else f"{SITE}/s/{WORDS[i % len(WORDS)]}/")
+        sources += chain[:-1]
+        targets += chain[1:]
+
+    for i in np.flatnonzero(loop):
+        sources += [urls[i], f"{urls[i]}-loop"]
+        targets += [f"{urls[i]}-loop", urls[i]]
+
+    moved = rename | exit_ | loop
+    live = pd.DataFrame({"url": urls[~moved], "is_redirected": False, "redirected_to": None})
+    redirected = pd.DataFrame({"url": sources, "is_redirected": True, "redirected_to": targets})
+
+    return pd.concat([live, redirected], ignore_index=True).sample(frac=1, random_state=int(rng.integers(1 << 31)))
+
+# ================= MAIN =================
+
+def generate(out_dir, n_tools, seed=0):
+    """
+    Write all synthetic inputs for `n_tools` tools into `out_dir`
+    → dict of file name → rows written
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    tools = tool_attributes(rng, n_tools)
+    order = rng.permutation(n_tools)
+
+    primary = np.sort(order[: int(n_tools * PRIMARY_SHARE)])
+    rest = np.sort(order[int(n_tools * PRIMARY_SHARE):])
+    wayback = np.sort(rng.choice(n_tools, int(n_tools * WAYBACK_SHARE), replace=False))
+    older = np.sort(rng.choice(rest, min(len(rest), int(n_tools * STILL_MISSING_SHARE)), replace=False))
+    listed = np.sort(rng.choice(n_tools, int(n_tools * LISTING_SHARE), replace=False))
+
+    files = {
+        "final_panel_data_final_4.csv": panel(rng, tools),
+        "clean_urls_3.csv": tools[["url"]],
+        "ai_tools_progress_14012026.csv": dump(rng, tools, primary, tools["url"].to_numpy(dtype=object)[primary]),
+        "ai_wayback_async_out_2025.csv": wayback_dump(rng, tools, wayback, 2025),
+        "ai_wayback_async_out_2024.csv": wayback_dump(rng, tools, np.union1d(wayback, rest), 2024),
+        "still_missing_unified.csv": wayback_dump(rng, tools, older, 2023),
+        "url_status_checked.csv": redirect_status(rng, tools),
+        "taaft_tools_2015_2025.csv": pd.DataFrame({
+            "year": rng.integers(2015, 2026, len(listed)).astype(float),
+            "tool_name": tools["name"].to_numpy(dtype=object)[listed],
+            "tool_url": tools["url"].to_numpy(dtype=object)[listed] + "/",
+        }),
+    }
+
+    for name, df in files.items():
+        df.to_csv(out / name, index=False)
+
+    return {name: len(df) for name, df in files.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--tools", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, rows in generate(args.out_dir, args.tools, args.seed).items():
+        print(f"{name:<34} {rows:>10} rows")
+
+
+if __name__ == "__main__":
+    main()
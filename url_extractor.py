@@ -1,70 +1,198 @@
-import csv
-from urllib.parse import urlparse
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import csv_loader
+from dtype_profile import iter_csv, profile_for, read_dtypes
+from stage_metrics import StageMetrics
+from url_utils import is_tool_url, parse_links
 
 INPUT_CSV = "final_panel_data_final_4.csv"
 OUTPUT_CSV = "clean_urls_3.csv"
 COLUMN_NAME = "internal_link"
 
-seen = set()
+# the file is split into byte ranges, parsed in parallel
+WORKERS = os.cpu_count() or 1
+RANGES_PER_WORKER = 4
+
+# bytes scanned at a time when counting quotes up to a range start
+QUOTE_SCAN_BLOCK = 64 << 20
+
+# a compressed input can't be split into byte ranges → streamed in chunks
+CHUNKSIZE = 500_000
+
 
-def extract_original_url(url):
+def next_row_start(data, pos, quoted):
     """
-    Handles both:
-    - Wayback URLs
-    - Direct URLs
+    Offset just past the first newline at or after `pos` that is outside a
+    quoted field; `quoted` is the quote state at `pos`
     """
-    if not url:
-        return None
+    while True:
+        if quoted:
+            q = data.find(b'"', pos)
+            if q < 0:
+                return len(data)
+            quoted, pos = False, q + 1
+            continue
 
-    # Wayback case
-    if "/web/" in url:
-        try:
-            part = url.split("/web/", 1)[1]
-            return part.split("/", 1)[1]
-        except IndexError:
-            return None
+        nl = data.find(b"\n", pos)
+        q = data.find(b'"', pos, nl if nl >= 0 else len(data))
+        if q < 0:
+            return nl + 1 if nl >= 0 else len(data)
+        quoted, pos = True, q + 1
 
-    # Direct URL case
-    return url
 
+def byte_ranges(path, n):
+    """
+    ~n byte ranges of whole rows after the header
+
+    A newline ends a row only outside quotes, i.e. with an even number of
+    quote characters before it ("" inside a field counts twice), so a range
+    never starts in the middle of a multi-line field.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
 
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        first = next_row_start(data, 0, False)    # past the header
 
-def is_valid_theresanaiforthat_url(url):
-    parsed = urlparse(url)
+        starts, pos, quotes = [first], first, 0
+        for i in range(1, n):
+            target = max(pos, first + (size - first) * i // n)
+            for block in range(pos, target, QUOTE_SCAN_BLOCK):
+                quotes += data[block:min(block + QUOTE_SCAN_BLOCK, target)].count(b'"')
+            pos = target
 
-    # Must be the correct domain
-    if parsed.netloc != "theresanaiforthat.com":
-        return False
+            start = next_row_start(data, target, quotes % 2 == 1)
+            quotes += data[target:start].count(b'"')
+            starts.append(start)
+            pos = start
 
-    # Must start with /ai/
-    if not parsed.path.startswith("/ai/"):
-        return False
+    bounds = sorted(set(starts)) + [size]
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if a < b]
 
-    return True
 
+def extract_range(args):
+    """
+    (path, start, end, header) → (unique tool URLs in file order, 64-bit hashes)
+    """
+    path, start, end, header = args
 
-with open(INPUT_CSV, newline="", encoding="utf-8") as infile, \
-     open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as outfile:
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
 
-    reader = csv.DictReader(infile)
-    writer = csv.writer(outfile)
+    if not data.strip():
+        return np.array([], dtype=object), np.array([], dtype=np.uint64)
 
-    writer.writerow(["url"])
+    links = pd.read_csv(
+        io.BytesIO(data),
+        header=None,
+        names=header,
+        usecols=[COLUMN_NAME],
+        dtype=read_dtypes(profile_for(path)) or str,
+        encoding="utf-8"
+    )[COLUMN_NAME]
 
-    for row in reader:
-        raw_url = row.get(COLUMN_NAME)
-        if not raw_url:
-            continue
+    return tool_urls(links)
 
-        original_url = extract_original_url(raw_url)
-        if not original_url:
-            continue
 
-        if not is_valid_theresanaiforthat_url(original_url):
-            continue
+def tool_urls(links):
+    """
+    Raw links → (unique tool URLs in order, 64-bit hashes)
+    """
+    # Handles both Wayback URLs and direct URLs
+    urls = parse_links(links)["tool_id"]
 
-        if original_url in seen:
-            continue
+    # Must be a theresanaiforthat.com/ai/ page
+    urls = urls[is_tool_url(urls)].drop_duplicates()
 
-        seen.add(original_url)
-        writer.writerow([original_url])
+    hashes = pd.util.hash_pandas_object(urls, index=False).to_numpy(dtype=np.uint64)
+    return urls.to_numpy(dtype=object), hashes
+
+
+def dedup_in_order(urls, hashes):
+    """
+    Keep the first occurrence of each URL, in file order
+
+    Dedups on the 64-bit hashes, then re-checks the dropped rows against
+    the kept URL with the same hash, so a hash collision never loses a URL.
+    """
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+
+    keep = np.zeros(len(urls), dtype=bool)
+    keep[first] = True
+
+    collided = ~keep & (urls != urls[first[inverse.ravel()]])
+    if collided.any():
+        # rare: exact dedup among the colliding rows only
+        extra = pd.Series(urls[collided], index=np.flatnonzero(collided))
+        extra = extra[~extra.isin(urls[keep])].drop_duplicates()
+        keep[extra.index] = True
+
+    return urls[keep]
+
+
+def main():
+    metrics = StageMetrics("url_extractor")
+    metrics.phase("index")
+
+    path = csv_loader.find_input(INPUT_CSV)
+    compressed = csv_loader.is_compressed(path)
+
+    header = csv_loader.read_header(path)
+    if COLUMN_NAME not in header:
+        raise ValueError(f"{path} has no {COLUMN_NAME} column")
+
+    parts = None
+    ranges = []
+
+    if not compressed:
+        ranges = byte_ranges(path, WORKERS * RANGES_PER_WORKER)
+        jobs = [(path, start, end, header) for start, end in ranges]
+        metrics.count("byte_ranges", len(ranges))
+
+        metrics.phase("match")
+
+        try:
+            if WORKERS > 1:
+                with ProcessPoolExecutor(WORKERS) as pool:
+                    parts = list(pool.map(extract_range, jobs))    # map keeps range order
+            else:
+                parts = [extract_range(job) for job in jobs]
+        except pd.errors.ParserError as e:
+            # stray quotes in unquoted fields throw the row boundaries off
+            print(f"Byte ranges don't parse ({e}); streaming the file instead")
+            metrics.count("range_fallback")
+            ranges = []
+
+    if parts is None:
+        # decompressed as a stream / read in file order
+        metrics.phase("match")
+        parts = [
+            tool_urls(chunk[COLUMN_NAME])
+            for chunk in iter_csv(path, CHUNKSIZE, usecols=[COLUMN_NAME])
+        ]
+
+    urls = np.concatenate([p[0] for p in parts]) if parts else np.array([], dtype=object)
+    hashes = np.concatenate([p[1] for p in parts]) if parts else np.array([], dtype=np.uint64)
+
+    clean_urls = dedup_in_order(urls, hashes)
+    metrics.count("tool_urls_before_dedup", len(urls))
+
+    metrics.phase("write")
+    pd.DataFrame({"url": clean_urls}).to_csv(OUTPUT_CSV, index=False)
+    metrics.rows_out(OUTPUT_CSV, len(clean_urls))
+
+    source = f"Ranges: {len(ranges)}" if ranges else "stream"
+    print(f"{source} | Unique tool URLs: {len(clean_urls)}")
+    metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
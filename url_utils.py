@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Shared URL canonicalization and Wayback link parsing.
+
+Every stage keys tools by the same canonical tool_id:
+    https://<host><path>   lowercased, http → https, no query/fragment,
+                           no trailing slash
+
+All helpers are columnar: they take a pandas Series of raw or Wayback links
+and return Series / DataFrames built with vectorized string ops.
+"""
+
+import pandas as pd
+
+# ================= CONFIG =================
+
+TOOL_URL_PREFIX = "https://theresanaiforthat.com/ai/"
+
+WAYBACK_PATTERN = (
+    r"^(?:https?://)?(?:web\.)?archive\.org/web/"
+    r"(?P<timestamp>\d{8,14})[a-z_]*/(?P<original>.+)$"
+)
+
+# ================= HELPERS =================
+
+def _as_string(values):
+    return pd.Series(values, copy=False).astype("string").str.strip()
+
+
+def canonical_url(urls):
+    """
+    Series of raw URLs → Series of canonical tool_ids (<NA> if not a URL)
+    """
+    s = (
+        _as_string(urls)
+        .str.lower()
+        .str.replace(r"^http://", "https://", regex=True)
+        .str.replace(r"[?#].*$", "", regex=True)
+        .str.rstrip("/")
+    )
+    return s.where(s.str.match(r"^https://[^/]+", na=False))
+
+
+def parse_links(links, wayback_only=False):
+    """
+    Series of raw or Wayback links → DataFrame[tool_id, snapshot_date]
+
+    snapshot_date is a datetime64 column (NaT for non-Wayback links).
+    With wayback_only=True, rows that are not Wayback links get tool_id <NA>.
+    """
+    s = _as_string(links)
+    parts = s.str.extract(WAYBACK_PATTERN)
+
+    is_wayback = parts["original"].notna()
+    original = parts["original"] if wayback_only else parts["original"].where(is_wayback, s)
+
+    return pd.DataFrame({
+        "tool_id": canonical_url(original),
+        "snapshot_date": pd.to_datetime(
+            parts["timestamp"].str[:8], format="%Y%m%d", errors="coerce"
+        ),
+    }, index=s.index)
+
+
+def is_tool_url(tool_ids):
+    """
+    Series of canonical tool_ids → boolean mask of theresanaiforthat /ai/ pages
+    """
+    return _as_string(tool_ids).str.startswith(TOOL_URL_PREFIX).fillna(False).astype(bool)
@@ -1,186 +1,291 @@
 #!/usr/bin/env python3
 
+import asyncio
+import os
+import sys
 import pandas as pd
-import requests
-import time
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
+from async_fetcher import Fetcher
+from cdx_cache import CdxCache
+from directory_store import DIRECTORY_PATH, atomic_write, read_directory, update_directory
+from directory_upsert import FILL_NA, upsert
+from page_cache import AsyncPageCache, PageCache
+from page_extract import extract_fields
+from result_journal import ResultJournal
+from stage_metrics import INCOMPLETE_EXIT, StageMetrics
+
 # ================= CONFIG =================
 
-INPUT_CSV = "new_directory.csv"
-OUTPUT_CSV = "new_directory.csv"
+INPUT_DIRECTORY = DIRECTORY_PATH
+OUTPUT_DIRECTORY = DIRECTORY_PATH      # updated in place, enriched rows only
 
 CDX_API = "https://web.archive.org/cdx/search/cdx"
+CDX_CACHE_DB = "cdx_cache.sqlite"
+PAGE_CACHE_DB = "page_cache.sqlite"
+
+# re-extract every cached page instead (no network, journal or directory):
+# results go to REEXTRACT_CSV, to check extractor changes offline
+CACHE_ONLY = False
+REEXTRACT_CSV = "page_reextract.csv"
+REEXTRACT_BATCH = 1000
+
+# every finished result is journaled; a rerun skips tool_ids already in it
+JOURNAL_PATH = "wayback_results.jsonl"
 HEADERS = {"User-Agent": "DirectoryBot/FINAL"}
 
-LIVE_WORKERS = 10
-WAYBACK_WORKERS = 4
+# concurrent connections per pool (theresanaiforthat.com, CDX API, replay)
+POOL_LIMITS = {
+    "live": 10,
+    "cdx": 4,
+    "replay": 4,
+}
+
+# HTML parsing runs in its own process pool, separate from the fetchers
+EXTRACT_WORKERS = os.cpu_count() or 1
 
 LIVE_TIMEOUT = 20
 WAYBACK_TIMEOUT = 30
 
+# directory column → extracted field (only empty cells are filled)
+RESULT_MAPPING = {
+    "name": "name",
+    "release_date": "release",
+}
+
 # ================= HELPERS =================
 
-def fetch(url, timeout, retries=3):
-    for attempt in range(retries):
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=timeout)
-            if r.status_code == 200:
-                return r.text
-        except requests.exceptions.RequestException:
-            pass
-        time.sleep(1 + attempt)
-    return None
-
-
-
-def extract_name_release(html, snapshot_year=None):
-    soup = BeautifulSoup(html, "lxml")
-
-    # ---- NAME ----
-    name = None
-    h1 = soup.select_one("h1.title_inner")
-    if h1:
-        name = h1.get_text(" ", strip=True).split(" v")[0]
-
-    # ---- RELEASE DATE ----
-    dates = []
-
-    if snapshot_year is None or snapshot_year >= 2025:
-        for d in soup.select(".version .changelog_title"):
-            try:
-                dates.append(datetime.strptime(d.text.strip(), "%B %d, %Y").date())
-            except:
-                pass
-    else:
-        for d in soup.select("span.launch_date_top"):
-            txt = d.text.strip()
-            for fmt in ("%Y-%m-%d", "%d %b %Y"):
-                try:
-                    dates.append(datetime.strptime(txt, fmt).date())
-                    break
-                except:
-                    pass
-
-    release = min(dates).isoformat() if dates else None
-    return name, release
-
-
-def latest_wayback_snapshot(url):
-    params = {
-        "url": url,
-        "output": "json",
-        "filter": "statuscode:200",
-        "filter": "mimetype:text/html",
-        "fl": "timestamp",
-        "limit": 1,
-        "sort": "reverse",
-    }
-
-    r = requests.get(CDX_API, params=params, timeout=30)
-    data = r.json()
+CDX_PARAMS = [
+    ("output", "json"),
+    ("filter", "statuscode:200"),
+    ("filter", "mimetype:text/html"),
+    ("fl", "timestamp"),
+    ("limit", 1),
+    ("sort", "reverse"),
+]
+
+
+def snapshot_url(url, ts):
+    return f"https://web.archive.org/web/{ts}/{url}"
+
+
+async def fetch_page(fetcher, pages, pool, url, timeout, snapshot=""):
+    """
+    HTML of `url` (its Wayback `snapshot` if given) or None, through the
+    page cache
+
+    Wayback snapshots never change, so they are served from the cache when
+    present; live pages are always refetched.
+    """
+    if snapshot:
+        cached = await pages.get(url, snapshot)
+        if cached is not None:
+            return cached.html if cached.status == 200 else None
+
+    target = snapshot_url(url, snapshot) if snapshot else url
+    status, html, headers = await fetcher.request(pool, target, timeout=timeout)
+    if status is not None:
+        await pages.put(url, status, headers, html, snapshot)
+
+    return html if status == 200 else None
+
+
+async def latest_wayback_snapshot(fetcher, cdx_cache, url):
+    data = cdx_cache.get(url, CDX_PARAMS)
+
+    if data is None:
+        data = await fetcher.get_json(
+            "cdx", CDX_API, params=[("url", url)] + CDX_PARAMS, timeout=WAYBACK_TIMEOUT
+        )
+        if data is None:
+            raise RuntimeError(f"CDX lookup failed: {url}")
+
+        cdx_cache.put(url, CDX_PARAMS, data)
 
     if len(data) <= 1:
-        return None, None
+        return None, None, None
 
     ts = data[1][0]
     year = int(ts[:4])
-    snap_url = f"https://web.archive.org/web/{ts}/{url}"
-
-    return snap_url, year
+    return snapshot_url(url, ts), ts, year
 
 
 # ================= WORKERS =================
 
-def process_live(tool_id):
+async def extract(extractors, html, snapshot_year=None):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(extractors, extract_fields, html, snapshot_year)
+
+
+async def process_live(fetcher, pages, extractors, tool_id):
     try:
-        html = fetch(tool_id, LIVE_TIMEOUT)
+        html = await fetch_page(fetcher, pages, "live", tool_id, LIVE_TIMEOUT)
         if not html:
-            return tool_id, None, None, None
+            return tool_id, None
 
-        name, release = extract_name_release(html)
-        return tool_id, name, release, datetime.utcnow().date().isoformat()
+        fields = await extract(extractors, html)
+        return tool_id, {**fields, "last_date": datetime.utcnow().date().isoformat()}
 
     except Exception:
-        return tool_id, None, None, None
+        return tool_id, None
 
 
 
-def process_wayback(tool_id):
+async def process_wayback(fetcher, cdx_cache, pages, extractors, tool_id):
     try:
-        snap_url, year = latest_wayback_snapshot(tool_id)
+        snap_url, ts, year = await latest_wayback_snapshot(fetcher, cdx_cache, tool_id)
         if not snap_url:
-            return tool_id, "0", None, None
+            return tool_id, {"name": "0"}
 
-        html = fetch(snap_url, WAYBACK_TIMEOUT)
+        html = await fetch_page(fetcher, pages, "replay", tool_id, WAYBACK_TIMEOUT, snapshot=ts)
         if not html:
-            return tool_id, None, None, None
-
-        name, release = extract_name_release(html, year)
-        ts = snap_url.split("/web/")[1][:8]
-        last = f"{ts[:4]}-{ts[4:6]}-{ts[6:8]}"
+            return tool_id, None
 
-        return tool_id, name, release, last
+        fields = await extract(extractors, html, year)
+        return tool_id, {**fields, "last_date": f"{ts[:4]}-{ts[4:6]}-{ts[6:8]}"}
 
     except Exception:
-        return tool_id, None, None, None
+        return tool_id, None
+
+
+async def fetch_all(live_ids, wayback_ids, journal, metrics=None):
+    """
+    Live and Wayback queues run together, each bounded by its pool limits;
+    results go straight to the journal as they arrive → number of failed
+    fetches (left out of the journal)
+    """
+    cdx_cache = CdxCache(CDX_CACHE_DB)
+    pages = AsyncPageCache(PageCache(PAGE_CACHE_DB))
+    cached = cdx_cache.preload(wayback_ids, CDX_PARAMS)
+    print(f"CDX cache: {cached} / {len(wayback_ids)} lookups cached")
+    if metrics is not None:
+        metrics.count("cdx_cached", cached)
+
+    failed = 0
+    with ProcessPoolExecutor(EXTRACT_WORKERS) as extractors:
+        async with Fetcher(POOL_LIMITS, headers=HEADERS, metrics=metrics) as fetcher:
+            jobs = (
+                [process_live(fetcher, pages, extractors, u) for u in live_ids]
+                + [process_wayback(fetcher, cdx_cache, pages, extractors, u) for u in wayback_ids]
+            )
+
+            for job in tqdm(asyncio.as_completed(jobs), total=len(jobs), desc="FETCH"):
+                tid, fields = await job
+                if fields is None:
+                    # not journaled → retried on the next run
+                    failed += 1
+                    if metrics is not None:
+                        metrics.count("failed")
+                    continue
+                journal.append(tid, fields)
+                if metrics is not None:
+                    metrics.count("matched")
+
+    cdx_cache.close()
+    pages.close()
+    return failed
+
+
+def reextract_cached(metrics):
+    """
+    Every cached page through extract_fields again → REEXTRACT_CSV, one row
+    per (tool_id, snapshot); the journal and the directory are not touched
+    """
+    pages = PageCache(PAGE_CACHE_DB)
+    rows = []
+
+    with ProcessPoolExecutor(EXTRACT_WORKERS) as extractors:
+        for batch in tqdm(pages.iter_pages(REEXTRACT_BATCH), desc="RE-EXTRACT", unit="batch"):
+            years = [int(p.snapshot[:4]) if p.snapshot else None for p in batch]
+            extracted = extractors.map(extract_fields, [p.html for p in batch], years, chunksize=16)
+
+            for page, fields in zip(batch, extracted):
+                if page.snapshot:
+                    last_date = f"{page.snapshot[:4]}-{page.snapshot[4:6]}-{page.snapshot[6:8]}"
+                else:
+                    last_date = datetime.utcfromtimestamp(page.fetched_at).date().isoformat()
+                rows.append({"tool_id": page.url, "snapshot": page.snapshot, **fields, "last_date": last_date})
+
+    pages.close()
+
+    out = pd.DataFrame(rows, columns=["tool_id", "snapshot", "name", "release", "last_date"])
+    atomic_write(REEXTRACT_CSV, lambda tmp: out.to_csv(tmp, index=False))
+    metrics.rows_out(REEXTRACT_CSV, len(out))
+    metrics.count("pages", len(out))
+    metrics.count("named", int(out["name"].notna().sum()))
+    metrics.count("dated", int(out["release"].notna().sum()))
+
+    print(f"✅ Re-extracted {len(out)} cached pages → {REEXTRACT_CSV}")
+    print(f"Name: {int(out['name'].notna().sum())} | Release date: {int(out['release'].notna().sum())}")
 
 # ================= MAIN =================
 
-df = pd.read_csv(INPUT_CSV)
-df["name"] = df["name"].replace("", pd.NA)
-df.set_index("tool_id", inplace=True)
+def main():
+    metrics = StageMetrics("wayback_directory_appender")
 
-assert df.index.is_unique, "tool_id index is not unique"
+    if CACHE_ONLY:
+        metrics.phase("match")
+        reextract_cached(metrics)
+        metrics.finish()
+        return
 
+    metrics.phase("load")
+    # only tools missing a name or release date are read
+    df = read_directory(
+        path=INPUT_DIRECTORY,
+        where=[[("name", "=", None)], [("name", "=", "")], [("release_date", "=", None)]],
+    )
+    metrics.rows_in(INPUT_DIRECTORY, len(df))
+    df["name"] = df["name"].replace("", pd.NA)
 
-targets = df[df["name"].isna() | df["release_date"].isna()]
+    assert df.index.is_unique, "tool_id index is not unique"
 
-live_ids = targets[targets["exited"] == 0].index.tolist()
-wayback_ids = targets[targets["exited"] == 1].index.tolist()
+    targets = df
 
-results = {}
+    live_ids = targets[targets["exited"] == 0].index.tolist()
+    wayback_ids = targets[targets["exited"] == 1].index.tolist()
 
-print(f"LIVE: {len(live_ids)} | WAYBACK: {len(wayback_ids)}")
+    # ---- RESUME ----
+    journal = ResultJournal(JOURNAL_PATH)
+    done = journal.tool_ids()
 
-# ---- LIVE ----
-with ThreadPoolExecutor(max_workers=LIVE_WORKERS) as ex:
-    for f in tqdm(as_completed([ex.submit(process_live, u) for u in live_ids]),
-                  total=len(live_ids), desc="LIVE"):
-        tid, name, release, last = f.result()
-        results[tid] = (name, release, last)
+    live_ids = [t for t in live_ids if t not in done]
+    wayback_ids = [t for t in wayback_ids if t not in done]
 
-# ---- WAYBACK ----
-with ThreadPoolExecutor(max_workers=WAYBACK_WORKERS) as ex:
-    for f in tqdm(as_completed([ex.submit(process_wayback, u) for u in wayback_ids]),
-                  total=len(wayback_ids), desc="WAYBACK"):
-        tid, name, release, last = f.result()
-        results[tid] = (name, release, last)
+    print(f"LIVE: {len(live_ids)} | WAYBACK: {len(wayback_ids)} | JOURNALED: {len(done)}")
+    metrics.count("live_targets", len(live_ids))
+    metrics.count("wayback_targets", len(wayback_ids))
+    metrics.count("journaled", len(done))
+
+    # ---- LIVE + WAYBACK ----
+    metrics.phase("match")
+    try:
+        failed = asyncio.run(fetch_all(live_ids, wayback_ids, journal, metrics))
+    finally:
+        journal.close()
 
-# ---- APPLY ----
-for tid, (name, release, last) in results.items():
-    current_name = df.loc[tid, "name"]
+    # ---- APPLY (replay journal) ----
+    metrics.phase("apply")
+    results_df = journal.read_frame(columns=list(RESULT_MAPPING.values()) + ["last_date"])
 
-    if name is not None and (
-        pd.isna(current_name).all()
-        if isinstance(current_name, pd.Series)
-        else pd.isna(current_name)
-    ):
-        df.loc[tid, "name"] = name
+    df = upsert(df, results_df, RESULT_MAPPING, policy=FILL_NA)
 
-    current_release = df.loc[tid, "release_date"]
+    metrics.phase("write")
+    enriched = df.index.intersection(results_df.index)
+    update_directory(df.loc[enriched], OUTPUT_DIRECTORY, columns=list(RESULT_MAPPING))
+    metrics.rows_out(OUTPUT_DIRECTORY, len(enriched))
+    journal.archive()
 
-    if release is not None and (
-        pd.isna(current_release).all()
-        if isinstance(current_release, pd.Series)
-        else pd.isna(current_release)
-    ):
-        df.loc[tid, "release_date"] = release
+    print("✅ DONE")
+    print(f"Enriched: {len(enriched)} | Failed (re-run to retry): {failed}")
+    metrics.finish(status="ok" if failed == 0 else "partial")
 
+    # run_pipeline runs the stage again until nothing is left to retry
+    if failed:
+        sys.exit(INCOMPLETE_EXIT)
 
-df.reset_index().to_csv(OUTPUT_CSV, index=False)
 
-print("✅ DONE")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Latest-snapshot index over a Wayback dump.
+
+Replaces the iterrows() + dict-of-rows grouping that used to live in
+directory_maker.py and directory_appender.py with one vectorized pass.
+"""
+
+import pandas as pd
+
+from url_utils import parse_links
+
+# ================= HELPERS =================
+
+def merge_latest(*frames):
+    """
+    tool_id-indexed frames with `snapshot_date` → newest row per tool
+
+    Ties keep the row from the earliest frame / earliest position.
+    """
+    frames = [f for f in frames if f is not None]
+    out = pd.concat(frames) if len(frames) > 1 else frames[0]
+    out = out.sort_values("snapshot_date", ascending=False, kind="stable")
+    return out[~out.index.duplicated(keep="first")]
+
+
+def latest_snapshots(df, link_col="link", columns=None, tool_ids=None):
+    """
+    Wayback dump → DataFrame indexed by tool_id, one row per tool
+
+    Keeps the newest snapshot per tool (first row in file order on ties),
+    adds a datetime64 `snapshot_date` column and drops non-Wayback links.
+    `columns` optionally restricts which dump columns are carried over;
+    `tool_ids` optionally restricts which tools are kept.
+    """
+    links = parse_links(df[link_col], wayback_only=True)
+
+    keep = links["tool_id"].notna()
+    if tool_ids is not None:
+        keep &= links["tool_id"].isin(tool_ids)
+
+    cols = [c for c in (columns or df.columns) if c != link_col]
+    out = df.loc[keep, cols].assign(snapshot_date=links.loc[keep, "snapshot_date"])
+    out.index = pd.Index(links.loc[keep, "tool_id"], name="tool_id")
+
+    return merge_latest(out)